@@ -1,76 +1,400 @@
-import base64
+import asyncio
 import logging
-from datetime import datetime
-from typing import AsyncIterator
+import time
+from functools import partial
+from typing import Any, AsyncIterator
 
 from elevenlabs.client import AsyncElevenLabs
 from langfuse import observe, Langfuse
-from openai import OpenAI, AsyncOpenAI
+from openai import AsyncOpenAI, BadRequestError, NotFoundError, OpenAI
+from pydantic import BaseModel, ValidationError
 
+from .audio_cache import AudioCache, cache_key
 from .calendar_client import CalendarClient
+from .context_compactor import ContextCompactor
 from .config.settings import settings
-from .models.calendar_models import CalendarEvent, CalendarTimeWindow
-from .models.stream_models import AudioChunk, TextChunk, ToolCallEvent, StreamEvent
-from .tools.calendar_tools import create_event_tool, read_calendar_tool, update_event_tool
+from .model_router import ModelRouter
+from .metrics import (
+    MODEL_TTFT_SECONDS,
+    MODEL_TURN_SECONDS,
+    TOOL_SECONDS,
+    TTS_FIRST_BYTE_SECONDS,
+    TTS_SEGMENT_SECONDS,
+)
+from .models.audio_models import AudioFormat
+from .models.calendar_models import CalendarEvent, CalendarTimeWindow, ConflictQuery, FreeSlotQuery
+from .models.stream_models import AudioChunk, TextChunk, ToolCallEvent, TranscriptEvent, StreamEvent
+from .prompt_builder import PromptBuilder, log_cache_usage
+from .session_backend import SqliteSessionBackend
+from .session_store import Session, SessionStore
+from .speech_pipeline import AudioReframer, SentenceSegmenter, SpeechPipeline
+from .tool_results import encode_event, encode_events, encode_time_windows
+from .tool_runner import ToolRunner
+from .tts_socket import SocketSpeech, SpeechSocketPool
+from .tools.calendar_tools import (
+    check_conflicts_tool,
+    create_event_tool,
+    find_free_slots_tool,
+    read_calendar_tool,
+    update_event_tool,
+)
 from .tools.web_search_tools import web_search_tool
+from .upstream import UpstreamLimiter, UpstreamOverloaded
+from .utils.enums import Mode, TTSBackend
 
 logger = logging.getLogger(__name__)
 
+CALENDAR_BATCH_OPERATIONS = {
+    "read_calendar": "read_calendar",
+    "create_calendar_event": "create_event",
+    "update_calendar_event": "update_event",
+}
+
+FIRST_TOKEN_EVENTS = {
+    "response.output_text.delta",
+    "response.function_call_arguments.delta",
+    "response.output_item.done",
+}
+
+TOOL_ARGUMENT_MODELS: dict[str, type[BaseModel]] = {
+    "read_calendar": CalendarTimeWindow,
+    "create_calendar_event": CalendarEvent,
+    "update_calendar_event": CalendarEvent,
+    "find_free_slots": FreeSlotQuery,
+    "check_conflicts": ConflictQuery,
+}
+
 
 class Agent:
     def __init__(self, model: str = "gpt-4.1"):
         self.model = model
-        self.client = OpenAI(api_key=settings.openai_api_key)
-        self.async_client = AsyncOpenAI(api_key=settings.openai_api_key)
-        self.elevenlabs_client = AsyncElevenLabs(api_key=settings.elevenlabs_api_key)
+        self.router = ModelRouter(
+            small_model=settings.router_small_model,
+            large_model=model,
+            small_max_chars=settings.router_small_max_chars,
+            enabled=settings.router_enabled,
+        )
+        self.client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url, max_retries=0)
+        self.async_client = AsyncOpenAI(
+            api_key=settings.openai_api_key, base_url=settings.openai_base_url, max_retries=0
+        )
+        self.elevenlabs_client = AsyncElevenLabs(
+            api_key=settings.elevenlabs_api_key, base_url=settings.elevenlabs_base_url
+        )
+        self.openai_limiter = UpstreamLimiter.from_settings("openai")
+        self.elevenlabs_limiter = UpstreamLimiter.from_settings("elevenlabs")
         self.langfuse = Langfuse(
             public_key=settings.langfuse_public_key,
             secret_key=settings.langfuse_secret_key,
             base_url=settings.langfuse_base_url,
         )
-        self.context = [{"role": "__system__", "content": "__content__"}]
+        self.sessions = SessionStore(
+            max_sessions=settings.session_max_sessions,
+            ttl_seconds=settings.session_ttl_seconds,
+            max_bytes=settings.session_max_bytes,
+            backend=(
+                SqliteSessionBackend(
+                    settings.session_db_path,
+                    ttl_seconds=settings.session_ttl_seconds,
+                    lease_seconds=settings.session_lease_seconds,
+                    lease_wait_seconds=settings.session_lease_wait_seconds,
+                )
+                if settings.session_db_path
+                else None
+            ),
+        )
+        self.compactor = ContextCompactor(
+            self.async_client,
+            self.openai_limiter,
+            budget_tokens=settings.context_budget_tokens,
+            keep_recent_turns=settings.context_keep_recent_turns,
+            elide_min_chars=settings.context_elide_min_chars,
+            summary_model=settings.context_summary_model,
+        )
         self.calendar_client = CalendarClient()
-        self.tools = [create_event_tool(), read_calendar_tool(), update_event_tool(), web_search_tool()]
+        self.tool_runner = ToolRunner(
+            self.call_function,
+            self.validate_arguments,
+            max_workers=settings.tool_max_workers,
+            max_concurrency=settings.tool_max_concurrency,
+            default_timeout=settings.tool_timeout_seconds,
+            timeouts=settings.tool_timeouts,
+            call_batch=self.call_calendar_batch,
+            batchable=(
+                {"create_calendar_event", "update_calendar_event"}
+                if self.calendar_client.store is not None
+                else set(CALENDAR_BATCH_OPERATIONS)
+            ),
+        )
+        self.tools = [
+            create_event_tool(),
+            read_calendar_tool(),
+            update_event_tool(),
+            find_free_slots_tool(),
+            check_conflicts_tool(),
+            web_search_tool(),
+        ]
+        self.prompt_builder = PromptBuilder(self.tools, chain_responses=settings.chain_responses)
         self.max_turns = 5
         self.elevenlabs_voice_id = "vBKc2FfBKJfcZNyEt1n6"
         self.elevenlabs_model_id = "eleven_turbo_v2_5"
+        self.audio_cache = (
+            AudioCache(
+                directory=settings.tts_cache_dir,
+                max_memory_bytes=settings.tts_cache_memory_bytes,
+                max_disk_bytes=settings.tts_cache_disk_bytes,
+            )
+            if settings.tts_cache_enabled
+            else None
+        )
+        self.speech_sockets = (
+            SpeechSocketPool(
+                self.elevenlabs_limiter,
+                api_key=settings.elevenlabs_api_key,
+                base_url=settings.elevenlabs_base_url,
+                voice_id=self.elevenlabs_voice_id,
+                model_id=self.elevenlabs_model_id,
+                idle_seconds=settings.tts_socket_idle_seconds,
+                max_sockets=settings.tts_socket_max_connections,
+                final_timeout=settings.tts_socket_final_timeout_seconds,
+            )
+            if settings.tts_backend == TTSBackend.WEBSOCKET.value
+            else None
+        )
+
+    def validate_arguments(self, name: str, args: str) -> str | None:
+        model = TOOL_ARGUMENT_MODELS.get(name)
+        if model is None:
+            logger.warning(f"Unknown tool requested: {name}")
+            return f"tool {name} does not exist."
+        try:
+            model.model_validate_json(args)
+        except ValidationError as e:
+            logger.warning(f"Invalid arguments for tool {name}: {e}")
+            return f"Tool call to {name} failed because its arguments are invalid: {e}"
+        return None
 
     def call_function(self, name: str, args: str) -> str:
+        started = time.perf_counter()
+        outcome = "ok"
         try:
+            max_tokens = settings.tool_result_max_tokens.get(name, settings.tool_result_default_max_tokens)
+
             if name == "read_calendar":
                 validated_args = CalendarTimeWindow.model_validate_json(args)
                 events = self.calendar_client.read_calendar(validated_args)
-                return "\n".join([event.model_dump_json(indent=2) for event in events])
+                return encode_events(events, max_tokens, name)
 
             if name == "create_calendar_event":
                 validated_args = CalendarEvent.model_validate_json(args)
-                return self.calendar_client.create_event(validated_args).model_dump_json(indent=2)
+                return encode_event(self.calendar_client.create_event(validated_args))
 
             if name == "update_calendar_event":
                 validated_args = CalendarEvent.model_validate_json(args)
-                return self.calendar_client.update_event(validated_args).model_dump_json(indent=2)
+                return encode_event(self.calendar_client.update_event(validated_args))
+
+            if name == "find_free_slots":
+                validated_args = FreeSlotQuery.model_validate_json(args)
+                slots = self.calendar_client.find_free_slots(validated_args)
+                if not slots:
+                    return f"No free slots of at least {validated_args.duration_minutes} minutes in this window."
+                return encode_time_windows(slots, max_tokens)
+
+            if name == "check_conflicts":
+                validated_args = ConflictQuery.model_validate_json(args)
+                conflicts = self.calendar_client.check_conflicts(validated_args)
+                if not conflicts:
+                    return "No conflicts with the proposed time."
+                return encode_events(conflicts, max_tokens, name)
 
             logger.warning(f"Unknown tool requested: {name}")
             return f"tool {name} does not exist."
 
         except Exception as e:
+            outcome = "error"
             logger.error(f"Tool call to {name} failed: {e}", exc_info=True)
             return f"Tool call to {name} failed. Either try a different tool or tell the user you are unable to complete their request right now."
 
+        finally:
+            TOOL_SECONDS.observe(time.perf_counter() - started, tool=name, outcome=outcome)
+
+    def call_calendar_batch(self, calls: list[tuple[str, str]]) -> list[str]:
+        started = time.perf_counter()
+        logger.info(f"Batching {len(calls)} calendar tool calls")
+        results: list[Any] = [None] * len(calls)
+        operations = []
+        valid = []
+        for index, (name, args) in enumerate(calls):
+            try:
+                operations.append(
+                    (CALENDAR_BATCH_OPERATIONS[name], TOOL_ARGUMENT_MODELS[name].model_validate_json(args))
+                )
+                valid.append(index)
+            except Exception as e:
+                results[index] = e
+
+        if operations:
+            try:
+                batch_results = self.calendar_client.batch(operations)
+            except Exception as e:
+                batch_results = [e] * len(operations)
+            for index, result in zip(valid, batch_results):
+                results[index] = result
+
+        outputs = []
+        for (name, _), result in zip(calls, results):
+            TOOL_SECONDS.observe(
+                time.perf_counter() - started, tool=name, outcome="error" if isinstance(result, Exception) else "ok"
+            )
+            if isinstance(result, Exception):
+                logger.error(f"Tool call to {name} failed: {result}")
+                outputs.append(
+                    f"Tool call to {name} failed. Either try a different tool or tell the user you are unable to complete their request right now."
+                )
+            elif name == "read_calendar":
+                max_tokens = settings.tool_result_max_tokens.get(name, settings.tool_result_default_max_tokens)
+                outputs.append(encode_events(result, max_tokens, name))
+            else:
+                outputs.append(encode_event(result))
+        return outputs
+
+    def _function_call_outputs(self, tool_calls: list[Any], results: list[str]) -> list[dict[str, str]]:
+        return [
+            {
+                "type": "function_call_output",
+                "call_id": tool_call.call_id,
+                "output": result,
+            }
+            for tool_call, result in zip(tool_calls, results)
+        ]
+
+    def _record_interrupted(self, session: Session, partial_text: str, pending_calls: list[Any]) -> None:
+        logger.info(f"Turn for session {session.id} interrupted ({len(partial_text)} chars generated)")
+        if pending_calls:
+            session.extend(
+                self._function_call_outputs(pending_calls, ["Cancelled before completion."] * len(pending_calls))
+            )
+        if partial_text:
+            session.append({"role": "assistant", "content": partial_text})
+
+    async def _synthesize(self, text: str, previous_text: str | None, output_format: str) -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        key = None
+        if self.audio_cache is not None:
+            key = cache_key(text, self.elevenlabs_voice_id, self.elevenlabs_model_id, output_format)
+            cached = await self.audio_cache.get(key)
+            if cached is not None:
+                logger.info(f"Serving cached TTS audio for: {text}")
+                TTS_FIRST_BYTE_SECONDS.observe(time.perf_counter() - started, source="cache")
+                TTS_SEGMENT_SECONDS.observe(time.perf_counter() - started, source="cache")
+                yield cached
+                return
+
+        audio = bytearray()
+        async for chunk in self._stream_tts(text, previous_text, output_format):
+            if not audio:
+                TTS_FIRST_BYTE_SECONDS.observe(time.perf_counter() - started, source="elevenlabs")
+            audio += chunk
+            yield chunk
+        TTS_SEGMENT_SECONDS.observe(time.perf_counter() - started, source="elevenlabs")
+        if self.audio_cache is not None and key is not None:
+            await self.audio_cache.put(key, bytes(audio))
+
+    async def _stream_tts(self, text: str, previous_text: str | None, output_format: str) -> AsyncIterator[bytes]:
+        logger.info(f"Starting ElevenLabs TTS for: {text}")
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self.elevenlabs_limiter.slot():
+                    audio_stream = self.elevenlabs_client.text_to_speech.stream(
+                        text=text,
+                        voice_id=self.elevenlabs_voice_id,
+                        model_id=self.elevenlabs_model_id,
+                        output_format=output_format,  # type: ignore[arg-type]
+                        previous_text=previous_text,
+                    )
+
+                    async for chunk in audio_stream:
+                        if isinstance(chunk, bytes):
+                            started = True
+                            yield chunk
+                return
+            except UpstreamOverloaded:
+                raise
+            except Exception as e:
+                delay = None if started else self.elevenlabs_limiter.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _respond(self, session: Session, query: str, turn: int) -> tuple[Any, str]:
+        model = self.router.route(query, Mode.TEXT, turn)
+        try:
+            return self._create_response(session, model), model
+        except UpstreamOverloaded:
+            raise
+        except Exception as e:
+            escalated = self.router.escalate(model, Mode.TEXT, turn, e)
+            if escalated is None:
+                raise
+            return self._create_response(session, escalated), escalated
+
+    async def _open_stream(self, session: Session, query: str, mode: Mode, turn: int) -> tuple[Any, str]:
+        model = self.router.route(query, mode, turn)
+        try:
+            return await self._create_stream(session, model), model
+        except UpstreamOverloaded:
+            raise
+        except Exception as e:
+            escalated = self.router.escalate(model, mode, turn, e)
+            if escalated is None:
+                raise
+            return await self._create_stream(session, escalated), escalated
+
+    def _create_response(self, session: Session, model: str) -> Any:
+        def create() -> Any:
+            return self.client.responses.create(model=model, **self.prompt_builder.request(session))
+
+        try:
+            return self.openai_limiter.call_sync(create)
+        except (NotFoundError, BadRequestError) as e:
+            if session.previous_response_id is None:
+                raise
+            logger.warning(f"Previous response for session {session.id} unavailable, resending history: {e}")
+            session.reset_response_chain()
+            return self.openai_limiter.call_sync(create)
+
+    async def _create_stream(self, session: Session, model: str) -> Any:
+        async def create() -> Any:
+            return await self.async_client.responses.create(
+                model=model, stream=True, **self.prompt_builder.request(session)
+            )
+
+        try:
+            return await self.openai_limiter.call(create)
+        except (NotFoundError, BadRequestError) as e:
+            if session.previous_response_id is None:
+                raise
+            logger.warning(f"Previous response for session {session.id} unavailable, resending history: {e}")
+            session.reset_response_chain()
+            return await self.openai_limiter.call(create)
+
     @observe(as_type="generation", capture_input=False, capture_output=False)
-    def chat(self, query: str) -> str:
-        self.context.append({"role": "user", "content": query})
+    def chat(self, query: str, session_id: str = "default") -> str:
+        session = self.sessions.get(session_id)
+        session.set_system_prompt(self.prompt_builder.system_prompt(Mode.TEXT))
+        session.extend(self.prompt_builder.user_turn(query))
 
         turns = 0
         while turns < self.max_turns:
-            response = self.client.responses.create(
-                model=self.model,
-                input=self.context,  # type: ignore[arg-type]
-                tools=self.tools,  # type: ignore[arg-type]
-            )
+            response, model = self._respond(session, query, turns)
+            log_cache_usage(session, response.usage)
 
             self.langfuse.update_current_generation(
-                input=self.context,
+                model=model,
+                input=session.context,
                 output=response.output,
                 usage_details={
                     "input": getattr(response.usage, "input_tokens", 0),
@@ -78,149 +402,191 @@ class Agent:
                 },
             )
 
-            if response.output_text:
+            tool_calls = [item for item in response.output if item.type == "function_call"]
+            if response.output_text and not tool_calls:
                 output_text = response.output_text
-                self.context.append({"role": "assistant", "content": output_text})
+                session.append({"role": "assistant", "content": output_text})
+                session.mark_sent(response.id)
                 return output_text
 
-            self.context += response.output
-            for tool_call in response.output:
-                if tool_call.type != "function_call":
-                    continue
-
-                name = tool_call.name
-                args = tool_call.arguments
-                result = self.call_function(name, args)
-                self.context.append(
-                    {
-                        "type": "function_call_output",
-                        "call_id": tool_call.call_id,
-                        "output": result,
-                    }
-                )
+            session.extend(response.output)
+            session.mark_sent(response.id)
+            results = self.tool_runner.run_many_sync([(call.name, call.arguments) for call in tool_calls])
+            session.extend(self._function_call_outputs(tool_calls, results))
 
             turns += 1
 
         return "Oops! Looks like I got stuck in an infinite loop, my head is starting to spin."
 
-    async def stream_text(self, query: str) -> AsyncIterator[StreamEvent]:
+    async def stream_text(self, query: str, session_id: str) -> AsyncIterator[StreamEvent]:
         logger.info(f"Answering in text mode for query: {query[:20]}...")
 
-        self.context[0] = {
-            "role": "system",
-            "content": f"""You are an AI assistant named Rtos (pronounced ar-tohs), 
-                be ready to answer the user's questions or perform actions via the tools you have available. 
-                Today's date and current time are: {datetime.now()}.""",
-        }
-
-        self.context.append({"role": "user", "content": query})
-
-        turns = 0
-        while turns < self.max_turns:
-            stream = await self.async_client.responses.create(
-                model=self.model,
-                input=self.context,  # type: ignore[arg-type]
-                tools=self.tools,  # type: ignore[arg-type]
-                stream=True,
-            )
-
-            response = None
-            async for event in stream:
-                if event.type == "response.output_text.delta":
-                    yield TextChunk(text=event.delta)
-                elif event.type == "response.completed":
-                    response = event.response
-
-            if response and response.output_text:
-                logger.info(f"Agent completed with response (turn {turns + 1})")
-                self.context.append({"role": "assistant", "content": response.output_text})
-                return
-
-            if response:
-                self.context += response.output
-                for tool_call in response.output:
-                    if tool_call.type == "function_call":
-                        logger.info(f"Calling tool: {tool_call.name}")
-                        yield ToolCallEvent(name=tool_call.name)
-                        result = self.call_function(tool_call.name, tool_call.arguments)
-                        self.context.append(
-                            {
-                                "type": "function_call_output",
-                                "call_id": tool_call.call_id,
-                                "output": result,
-                            }
-                        )
-
-            turns += 1
+        async with self.sessions.acquire(session_id) as session:
+            session.set_system_prompt(self.prompt_builder.system_prompt(Mode.TEXT))
+            self.compactor.compact(session)
+            session.extend(self.prompt_builder.user_turn(query))
+
+            turns = 0
+            while turns < self.max_turns:
+                turn_started = time.perf_counter()
+                first_token = False
+                stream, model = await self._open_stream(session, query, Mode.TEXT, turns)
+
+                response = None
+                partial_text: list[str] = []
+                pending_calls: list[Any] = []
+                dispatch = self.tool_runner.dispatch()
+                try:
+                    async for event in stream:
+                        if not first_token and event.type in FIRST_TOKEN_EVENTS:
+                            first_token = True
+                            MODEL_TTFT_SECONDS.observe(
+                                time.perf_counter() - turn_started, mode=Mode.TEXT.value, model=model
+                            )
+                        if event.type == "response.output_text.delta":
+                            partial_text.append(event.delta)
+                            yield TextChunk(text=event.delta)
+                        elif event.type == "response.output_item.done" and event.item.type == "function_call":
+                            logger.info(f"Calling tool: {event.item.name}")
+                            yield ToolCallEvent(name=event.item.name)
+                            dispatch.start(event.item.call_id, event.item.name, event.item.arguments)
+                        elif event.type == "response.completed":
+                            response = event.response
+                            log_cache_usage(session, response.usage)
+
+                    tool_calls = [item for item in response.output if item.type == "function_call"] if response else []
+                    if response and response.output_text and not tool_calls:
+                        logger.info(f"Agent completed with response (turn {turns + 1})")
+                        session.append({"role": "assistant", "content": response.output_text})
+                        session.mark_sent(response.id)
+                        return
+
+                    if response:
+                        session.extend(response.output)
+                        session.mark_sent(response.id)
+                        partial_text.clear()
+                        pending_calls = tool_calls
+                        for tool_call in tool_calls:
+                            if not dispatch.started(tool_call.call_id):
+                                logger.info(f"Calling tool: {tool_call.name}")
+                                yield ToolCallEvent(name=tool_call.name)
+                        results = await dispatch.results(tool_calls)
+                        pending_calls = []
+                        session.extend(self._function_call_outputs(tool_calls, results))
+                except (asyncio.CancelledError, GeneratorExit):
+                    self._record_interrupted(session, "".join(partial_text), pending_calls)
+                    raise
+                finally:
+                    await stream.close()
+                    await dispatch.close()
+                    MODEL_TURN_SECONDS.observe(time.perf_counter() - turn_started, mode=Mode.TEXT.value, model=model)
+
+                turns += 1
 
         logger.warning(f"chat_stream reached max turns ({self.max_turns})")
         raise Exception("Agent reached maximum turns without completing")
 
-    async def stream_speech(self, query: str) -> AsyncIterator[StreamEvent]:
+    async def stream_speech(self, query: str, session_id: str, audio_format: AudioFormat) -> AsyncIterator[StreamEvent]:
         logger.info(f"Answering in speech mode for query: {query[:20]}...")
 
-        self.context[0] = {
-            "role": "system",
-            "content": f"""You are an AI assistant named Rtos (pronounced art-ohs), 
-            be ready to answer the user's questions or perform actions via the tools you have available. 
-            Today's date and current time are: {datetime.now()}. You are responding via speech mode. This means that your
-            answers will be spoken out loud. Because of this, make sure that your answer emulates spoken language.
-            Avoid using written elements that you would not find in spoken language (like urls or emojis), and that all acroyms are written out 
-            in plain language instead.
-            """,
-        }
+        async with self.sessions.acquire(session_id) as session:
+            session.set_system_prompt(self.prompt_builder.system_prompt(Mode.SPEECH))
+            self.compactor.compact(session)
+            session.extend(self.prompt_builder.user_turn(query))
 
-        self.context.append({"role": "user", "content": query})
-
-        turns = 0
-        while turns < self.max_turns:
-            stream = await self.async_client.responses.create(
-                model=self.model,
-                input=self.context,  # type: ignore[arg-type]
-                tools=self.tools,  # type: ignore[arg-type]
-                stream=True,
+            segmenter = SentenceSegmenter(
+                min_sentence_chars=settings.tts_min_sentence_chars,
+                min_clause_chars=settings.tts_min_clause_chars,
             )
-
-            response = None
-            async for event in stream:
-                if event.type == "response.completed":
-                    response = event.response
-
-            if response and response.output_text:
-                final_text = response.output_text
-
-                logger.info(f"Starting ElevenLabs TTS for: {final_text}")
-                audio_stream = self.elevenlabs_client.text_to_speech.stream(
-                    text=final_text,
-                    voice_id=self.elevenlabs_voice_id,
-                    model_id=self.elevenlabs_model_id,
-                    output_format="mp3_44100_128",
+            speech: SpeechPipeline | SocketSpeech
+            if self.speech_sockets is not None:
+                speech = await self.speech_sockets.open(session_id, audio_format.name, segmenter)
+            else:
+                speech = SpeechPipeline(
+                    partial(self._synthesize, output_format=audio_format.name),
+                    max_concurrency=settings.tts_max_concurrency,
+                    segmenter=segmenter,
                 )
-
-                async for chunk in audio_stream:
-                    if isinstance(chunk, bytes):
-                        yield AudioChunk(data=base64.b64encode(chunk).decode("ascii"))
-
-                logger.info(f"Agent completed with response (turn {turns + 1})")
-                self.context.append({"role": "assistant", "content": final_text})
-                return
-
-            if response:
-                self.context += response.output
-                for tool_call in response.output:
-                    if tool_call.type == "function_call":
-                        logger.info(f"Calling tool: {tool_call.name}")
-                        yield ToolCallEvent(name=tool_call.name)
-                        result = self.call_function(tool_call.name, tool_call.arguments)
-                        self.context.append(
-                            {
-                                "type": "function_call_output",
-                                "call_id": tool_call.call_id,
-                                "output": result,
-                            }
+            reframer = AudioReframer(frame_bytes=audio_format.bytes_per_second * settings.tts_frame_ms // 1000)
+
+            try:
+                turns = 0
+                while turns < self.max_turns:
+                    turn_started = time.perf_counter()
+                    first_token = False
+                    stream, model = await self._open_stream(session, query, Mode.SPEECH, turns)
+
+                    response = None
+                    partial_text: list[str] = []
+                    pending_calls: list[Any] = []
+                    dispatch = self.tool_runner.dispatch()
+                    try:
+                        async for event in stream:
+                            if not first_token and event.type in FIRST_TOKEN_EVENTS:
+                                first_token = True
+                                MODEL_TTFT_SECONDS.observe(
+                                    time.perf_counter() - turn_started, mode=Mode.SPEECH.value, model=model
+                                )
+                            if event.type == "response.output_text.delta":
+                                partial_text.append(event.delta)
+                                speech.feed(event.delta)
+                                for chunk in speech.drain_nowait():
+                                    for frame in reframer.feed(chunk):
+                                        yield AudioChunk(data=frame, mime_type=audio_format.mime_type)
+                            elif event.type == "response.output_item.done" and event.item.type == "function_call":
+                                logger.info(f"Calling tool: {event.item.name}")
+                                yield ToolCallEvent(name=event.item.name)
+                                dispatch.start(event.item.call_id, event.item.name, event.item.arguments)
+                            elif event.type == "response.completed":
+                                response = event.response
+                                log_cache_usage(session, response.usage)
+
+                        tool_calls = (
+                            [item for item in response.output if item.type == "function_call"] if response else []
+                        )
+                        if response and response.output_text and not tool_calls:
+                            final_text = response.output_text
+
+                            speech.finish()
+                            async for chunk in speech.drain():
+                                for frame in reframer.feed(chunk):
+                                    yield AudioChunk(data=frame, mime_type=audio_format.mime_type)
+
+                            last_frame = reframer.flush()
+                            if last_frame:
+                                yield AudioChunk(data=last_frame, mime_type=audio_format.mime_type)
+                            yield TranscriptEvent(text=final_text)
+
+                            logger.info(f"Agent completed with response (turn {turns + 1})")
+                            session.append({"role": "assistant", "content": final_text})
+                            session.mark_sent(response.id)
+                            return
+
+                        if response:
+                            session.extend(response.output)
+                            session.mark_sent(response.id)
+                            partial_text.clear()
+                            pending_calls = tool_calls
+                            for tool_call in tool_calls:
+                                if not dispatch.started(tool_call.call_id):
+                                    logger.info(f"Calling tool: {tool_call.name}")
+                                    yield ToolCallEvent(name=tool_call.name)
+                            results = await dispatch.results(tool_calls)
+                            pending_calls = []
+                            session.extend(self._function_call_outputs(tool_calls, results))
+                    except (asyncio.CancelledError, GeneratorExit):
+                        self._record_interrupted(session, "".join(partial_text), pending_calls)
+                        raise
+                    finally:
+                        await stream.close()
+                        await dispatch.close()
+                        MODEL_TURN_SECONDS.observe(
+                            time.perf_counter() - turn_started, mode=Mode.SPEECH.value, model=model
                         )
 
-            turns += 1
+                    turns += 1
+            finally:
+                await speech.close()
 
         logger.warning(f"chat_stream reached max turns ({self.max_turns})")
         raise Exception("Agent reached maximum turns without completing")
@@ -1,5 +1,9 @@
+import asyncio
+import base64
 import logging
+import time
 
+from itertools import count
 from uuid import uuid4
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
@@ -8,8 +12,13 @@ from a2a.types import Role, TaskState, Message, Part, TextPart, DataPart, FilePa
 from a2a.utils import new_task
 
 from .agent import Agent
-from .models.stream_models import AudioChunk, TextChunk, ToolCallEvent
-from .utils.enums import Mode
+from .audio_broker import AudioBroker
+from .config.settings import settings
+from .metrics import ENQUEUE_SECONDS, REQUEST_SECONDS
+from .models.audio_models import AUDIO_FORMATS, AudioFormat
+from .models.stream_models import AudioChunk, TextChunk, ToolCallEvent, TranscriptEvent
+from .stream_coalescer import coalesce_text
+from .utils.enums import AudioTransport, Mode
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +26,15 @@ logger = logging.getLogger(__name__)
 class Executor(AgentExecutor):
     def __init__(self):
         self.agent = Agent()
+        self.audio_broker = AudioBroker(ttl_seconds=settings.audio_stream_ttl_seconds)
+        self.running: dict[str, asyncio.Task] = {}
+
+    def _negotiate_audio_format(self, requested: str | None) -> AudioFormat:
+        if requested in settings.tts_allowed_formats and requested in AUDIO_FORMATS:
+            return AUDIO_FORMATS[requested]
+        if requested:
+            logger.warning(f"Unsupported audio format requested: {requested}, using {settings.tts_output_format}")
+        return AUDIO_FORMATS[settings.tts_output_format]
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         query = context.get_user_input()
@@ -34,73 +52,129 @@ class Executor(AgentExecutor):
             logger.info(f"Continuing existing task: {task.id}")
 
         updater = TaskUpdater(event_queue, task.id, task.context_id)
+        message_prefix = uuid4().hex
+        message_ids = count()
+
+        def message(parts: list[Part]) -> Message:
+            return Message(
+                message_id=f"{message_prefix}-{next(message_ids)}",
+                context_id=task.context_id,
+                task_id=task.id,
+                role=Role.agent,
+                parts=parts,
+            )
+
+        async def publish(kind: str, parts: list[Part]) -> None:
+            with ENQUEUE_SECONDS.time(kind=kind):
+                await updater.update_status(TaskState.working, message(parts))
 
+        audio_format = self._negotiate_audio_format(context.metadata.get("audio_format"))
+        binary_audio = (
+            mode == Mode.SPEECH.value and context.metadata.get("audio_transport") == AudioTransport.BINARY.value
+        )
+
+        stream = None
+        started = time.perf_counter()
+        state = TaskState.failed
+        self.running[task.id] = asyncio.current_task()  # type: ignore[assignment]
         try:
-            stream = self.agent.stream_speech(query) if mode == Mode.SPEECH.value else self.agent.stream_text(query)
+            if binary_audio:
+                self.audio_broker.open(task.id, audio_format.mime_type)
+                await publish(
+                    "audio_stream",
+                    [
+                        Part(
+                            root=DataPart(
+                                data={
+                                    "type": "audio_stream",
+                                    "url": f"/audio/{task.id}",
+                                    "mime_type": audio_format.mime_type,
+                                }
+                            )
+                        )
+                    ],
+                )
+
+            stream = (
+                self.agent.stream_speech(query, task.context_id, audio_format)
+                if mode == Mode.SPEECH.value
+                else coalesce_text(
+                    self.agent.stream_text(query, task.context_id),
+                    window_seconds=settings.stream_coalesce_window_seconds,
+                    max_chars=settings.stream_coalesce_max_chars,
+                )
+            )
 
+            text_chunks = 0
+            reply: list[str] = []
             async for event in stream:
                 if isinstance(event, ToolCallEvent):
                     logger.info(f"Streaming tool call event: {event.name}")
-                    await updater.update_status(
-                        TaskState.working,
-                        Message(
-                            message_id=uuid4().hex,
-                            context_id=task.context_id,
-                            task_id=task.id,
-                            role=Role.agent,
-                            parts=[Part(root=DataPart(data={"type": "tool_call", "name": event.name}))],
-                        ),
-                    )
+                    await publish("tool_call", [Part(root=DataPart(data={"type": "tool_call", "name": event.name}))])
                 elif isinstance(event, TextChunk):
-                    logger.info(f"Streaming text chunk: {len(event.text)} chars")
-                    await updater.update_status(
-                        TaskState.working,
-                        Message(
-                            message_id=uuid4().hex,
-                            context_id=task.context_id,
-                            task_id=task.id,
-                            role=Role.agent,
-                            parts=[Part(root=TextPart(text=event.text))],
-                        ),
-                    )
+                    text_chunks += 1
+                    reply.append(event.text)
+                    logger.debug(f"Streaming text chunk: {len(event.text)} chars")
+                    await publish("text", [Part(root=TextPart(text=event.text))])
+                elif isinstance(event, TranscriptEvent):
+                    reply.append(event.text)
+                elif isinstance(event, AudioChunk) and binary_audio:
+                    self.audio_broker.publish(task.id, event.data)
                 elif isinstance(event, AudioChunk):
-                    logger.info(f"Streaming audio chunk: {len(event.data)} base64 chars")
-                    await updater.update_status(
-                        TaskState.working,
-                        Message(
-                            message_id=uuid4().hex,
-                            context_id=task.context_id,
-                            task_id=task.id,
-                            role=Role.agent,
-                            parts=[
-                                Part(
-                                    root=FilePart(
-                                        file=FileWithBytes(
-                                            bytes=event.data,
-                                            mime_type=event.mime_type,
-                                        )
+                    logger.debug(f"Streaming audio chunk: {len(event.data)} bytes")
+                    await publish(
+                        "audio",
+                        [
+                            Part(
+                                root=FilePart(
+                                    file=FileWithBytes(
+                                        bytes=base64.b64encode(event.data).decode("ascii"),
+                                        mime_type=event.mime_type,
                                     )
                                 )
-                            ],
-                        ),
+                            )
+                        ],
                     )
 
-            logger.info(f"Task {task.id} completed successfully")
+            logger.info(f"Task {task.id} completed successfully ({text_chunks} text updates)")
+            if reply:
+                await updater.add_artifact([Part(root=TextPart(text="".join(reply)))], name="response")
             await updater.complete()
+            state = TaskState.completed
+
+        except asyncio.CancelledError:
+            logger.info(f"Task {task.id} cancelled")
+            state = TaskState.canceled
+            await updater.cancel()
+            raise
 
         except Exception as e:
             logger.error(f"Task {task.id} failed: {e}", exc_info=True)
             await updater.update_status(
                 TaskState.failed,
-                Message(
-                    message_id=uuid4().hex,
-                    context_id=task.context_id,
-                    task_id=task.id,
-                    role=Role.agent,
-                    parts=[Part(root=TextPart(text=f"Error: {e}"))],
-                ),
+                message([Part(root=TextPart(text=f"Error: {e}"))]),
                 final=True,
             )
 
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - started, mode=mode, state=state.value)
+            self.running.pop(task.id, None)
+            if stream is not None:
+                await stream.aclose()
+            if binary_audio:
+                self.audio_broker.close(task.id)
+
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        raise Exception("Cancel not supported")
+        task_id = context.task_id
+        if not task_id:
+            raise Exception("No task to cancel")
+
+        running = self.running.pop(task_id, None)
+        if running is not None and not running.done():
+            logger.info(f"Cancelling running task: {task_id}")
+            running.cancel()
+            await asyncio.wait([running])
+            return
+
+        logger.info(f"Task {task_id} is not running on this worker, marking it cancelled")
+        await TaskUpdater(event_queue, task_id, context.context_id or "").cancel()
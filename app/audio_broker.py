@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from typing import AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+class AudioStream:
+    def __init__(self, mime_type: str):
+        self.mime_type = mime_type
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self.subscribed = False
+
+
+class AudioBroker:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._streams: dict[str, AudioStream] = {}
+
+    def open(self, stream_id: str, mime_type: str) -> None:
+        self._streams[stream_id] = AudioStream(mime_type)
+        asyncio.get_running_loop().call_later(self.ttl_seconds, self._expire, stream_id)
+
+    def publish(self, stream_id: str, data: bytes) -> None:
+        stream = self._streams.get(stream_id)
+        if stream is not None:
+            stream.queue.put_nowait(data)
+
+    def close(self, stream_id: str) -> None:
+        stream = self._streams.get(stream_id)
+        if stream is not None:
+            stream.queue.put_nowait(None)
+
+    def get(self, stream_id: str) -> AudioStream | None:
+        stream = self._streams.get(stream_id)
+        if stream is None or stream.subscribed:
+            return None
+        stream.subscribed = True
+        return stream
+
+    async def subscribe(self, stream_id: str, stream: AudioStream) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                data = await stream.queue.get()
+                if data is None:
+                    return
+                yield data
+        finally:
+            self._streams.pop(stream_id, None)
+
+    def _expire(self, stream_id: str) -> None:
+        stream = self._streams.get(stream_id)
+        if stream is not None and not stream.subscribed:
+            logger.info(f"Dropping unclaimed audio stream {stream_id}")
+            del self._streams[stream_id]
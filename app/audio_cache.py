@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(text: str, voice_id: str, model_id: str, output_format: str) -> str:
+    normalized = " ".join(text.split())
+    return hashlib.sha256("\0".join([normalized, voice_id, model_id, output_format]).encode()).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, directory: str | None, max_memory_bytes: int, max_disk_bytes: int):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] | None = None
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> bytes | None:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            return audio
+        if self.directory is None:
+            return None
+
+        audio = await asyncio.to_thread(self._read, key)
+        if audio is not None:
+            self._remember(key, audio)
+        return audio
+
+    async def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        self._remember(key, audio)
+        if self.directory is not None:
+            await asyncio.to_thread(self._write, key, audio)
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory or "", key[:2], key)
+
+    def _index(self) -> OrderedDict[str, int]:
+        if self._disk is None:
+            entries = []
+            if self.directory and os.path.isdir(self.directory):
+                for root, _, files in os.walk(self.directory):
+                    for name in files:
+                        if name.endswith(".tmp"):
+                            continue
+                        stat = os.stat(os.path.join(root, name))
+                        entries.append((stat.st_mtime, name, stat.st_size))
+            self._disk = OrderedDict((name, size) for _, name, size in sorted(entries))
+            self._disk_bytes = sum(self._disk.values())
+            logger.info(f"Loaded TTS audio cache index: {len(self._disk)} entries, {self._disk_bytes} bytes")
+        return self._disk
+
+    def _read(self, key: str) -> bytes | None:
+        with self._lock:
+            index = self._index()
+            if key not in index:
+                return None
+            try:
+                with open(self._path(key), "rb") as file:
+                    audio = file.read()
+                os.utime(self._path(key))
+            except OSError:
+                self._disk_bytes -= index.pop(key)
+                return None
+            index.move_to_end(key)
+            return audio
+
+    def _write(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_disk_bytes:
+            return
+        with self._lock:
+            index = self._index()
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as file:
+                file.write(audio)
+            os.replace(temporary, path)
+
+            self._disk_bytes += len(audio) - index.pop(key, 0)
+            index[key] = len(audio)
+            while self._disk_bytes > self.max_disk_bytes:
+                evicted, size = index.popitem(last=False)
+                self._disk_bytes -= size
+                try:
+                    os.remove(self._path(evicted))
+                except OSError:
+                    pass
@@ -1,24 +1,93 @@
 from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.credentials import AnonymousCredentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import urljoin
+import logging
 import os.path
 import pickle
-from .models.calendar_models import CalendarEvent, CalendarTimeWindow
+import threading
+import time
+from .calendar_index import free_slots
+from .calendar_store import CalendarEventStore, event_bounds, parse_datetime
+from .http_pool import AuthorizedHttpPool
+from .metrics import CALENDAR_REQUEST_SECONDS
+from .upstream import UpstreamLimiter
+from .models.calendar_models import CalendarEvent, CalendarTimeWindow, ConflictQuery, FreeSlotQuery
 from .config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+BATCH_FAILURES = {
+    "create_event": "Failed to create calendar event",
+    "update_event": "Failed to update calendar event",
+    "read_calendar": "Failed to read calendar",
+}
+
 
 class CalendarClient:
     def __init__(self):
         self.creds = None
-        self.service = None
-        self._authenticate()
+        self._service = None
+        self.http_pool: AuthorizedHttpPool | None = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._token_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "token.pickle")
+        self.store = (
+            CalendarEventStore(max_staleness_seconds=settings.calendar_cache_max_staleness_seconds)
+            if settings.calendar_cache_enabled
+            else None
+        )
+        self.limiter = UpstreamLimiter.from_settings("calendar")
+
+    @property
+    def service(self) -> Any:
+        return self._ensure_service()
+
+    def _ensure_service(self) -> Any:
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    self._authenticate()
+        return self._service
+
+    def warm_up(self) -> None:
+        try:
+            self._ensure_service()
+        except Exception as e:
+            logger.warning(f"Google Calendar warm-up failed, will retry on first use: {e}")
+
+    def close(self) -> None:
+        self._closed.set()
+        if self.http_pool is not None:
+            self.http_pool.close()
 
     def _authenticate(self):
-        module_dir = os.path.dirname(os.path.abspath(__file__))
-        token_file = os.path.join(module_dir, "token.pickle")
+        if settings.calendar_anonymous:
+            self.creds = AnonymousCredentials()
+        else:
+            self._load_credentials()
+
+        self.http_pool = AuthorizedHttpPool(
+            self.creds, size=settings.calendar_http_pool_size, timeout=settings.calendar_http_timeout_seconds
+        )
+        self._service = build(
+            "calendar",
+            "v3",
+            credentials=self.creds,
+            static_discovery=True,
+            cache_discovery=False,
+            client_options={"api_endpoint": settings.calendar_api_endpoint} if settings.calendar_api_endpoint else None,
+        )
+        threading.Thread(target=self._refresh_credentials, name="calendar-token-refresh", daemon=True).start()
 
-        if os.path.exists(token_file):
-            with open(token_file, "rb") as token:
+    def _load_credentials(self) -> None:
+        if os.path.exists(self._token_file):
+            with open(self._token_file, "rb") as token:
                 self.creds = pickle.load(token)
 
         if not self.creds or not self.creds.valid:
@@ -31,24 +100,51 @@ class CalendarClient:
                 )
                 self.creds = flow.run_local_server(port=0)
 
-            with open(token_file, "wb") as token:
-                pickle.dump(self.creds, token)
+            self._save_token()
 
-        self.service = build("calendar", "v3", credentials=self.creds)
+    def _save_token(self) -> None:
+        temporary = f"{self._token_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as token:
+            pickle.dump(self.creds, token)
+        os.replace(temporary, self._token_file)
+
+    def _refresh_credentials(self) -> None:
+        while self.creds is not None and self.creds.expiry is not None and self.creds.refresh_token:
+            remaining = (self.creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds()
+            if self._closed.wait(max(remaining - settings.calendar_token_refresh_margin_seconds, 0)):
+                return
+            try:
+                self.creds.refresh(Request())
+                self._save_token()
+                logger.info(f"Refreshed Google Calendar credentials, valid until {self.creds.expiry}")
+            except Exception as e:
+                logger.warning(f"Refreshing Google Calendar credentials failed: {e}")
+                if self._closed.wait(settings.calendar_token_refresh_retry_seconds):
+                    return
+
+    def _execute(self, request: Any, idempotent: bool = True) -> Any:
+        def execute() -> Any:
+            if self.http_pool is None:
+                return request.execute()
+            with self.http_pool.connection() as http:
+                return request.execute(http=http)
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self.limiter.call_sync(execute, idempotent)
+            outcome = "ok"
+            return response
+        finally:
+            CALENDAR_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=getattr(request, "methodId", "batch"), outcome=outcome
+            )
 
     def create_event(self, event: CalendarEvent) -> CalendarEvent:
         if self.service is None:
             raise Exception("Failed to create calendar event: Google Calendar service not initialized.")
         try:
-            response = (
-                self.service.events()
-                .insert(
-                    calendarId=settings.email_address,
-                    body=event.model_dump(exclude={"status"}),
-                )
-                .execute()
-            )
-            return CalendarEvent.model_validate(obj=response, extra="ignore")
+            return self._stored(self._execute(self._insert_request(event), idempotent=False))
 
         except Exception as e:
             raise Exception(f"Failed to create calendar event: {e}") from e
@@ -57,16 +153,7 @@ class CalendarClient:
         if self.service is None:
             raise Exception("Failed to update calendar event: Google Calendar service not initialized.")
         try:
-            response = (
-                self.service.events()
-                .update(
-                    calendarId=settings.email_address,
-                    eventId=event.id,
-                    body=event.model_dump(exclude={"status", "id"}),
-                )
-                .execute()
-            )
-            return CalendarEvent.model_validate(obj=response, extra="ignore")
+            return self._stored(self._execute(self._update_request(event)))
 
         except Exception as e:
             raise Exception(f"Failed to update calendar event: {e}") from e
@@ -75,17 +162,169 @@ class CalendarClient:
         if self.service is None:
             raise Exception("Failed to read calendar: Google Calendar service not initialized.")
         try:
-            events = (
-                self.service.events()
-                .list(
+            cached = self._cached_events(time_window)
+            if cached is not None:
+                return cached
+
+            events = self._execute(self._list_request(time_window))
+            return [CalendarEvent.model_validate(obj=event, extra="ignore") for event in events["items"]]
+        except Exception as e:
+            raise Exception(f"Failed to read calendar: {e}") from e
+
+    def batch(self, operations: list[tuple[str, Any]]) -> list[Any]:
+        if self.service is None:
+            raise Exception("Failed to run calendar batch: Google Calendar service not initialized.")
+
+        results: list[Any] = [None] * len(operations)
+
+        def handle(request_id: str, response: Any, exception: Exception | None) -> None:
+            index = int(request_id)
+            operation = operations[index][0]
+            if exception is not None:
+                results[index] = Exception(f"{BATCH_FAILURES[operation]}: {exception}")
+            elif operation == "read_calendar":
+                results[index] = [
+                    CalendarEvent.model_validate(obj=event, extra="ignore") for event in response["items"]
+                ]
+            else:
+                results[index] = self._stored(response)
+
+        batches: list[tuple[BatchHttpRequest, list[int]]] = []
+        size = settings.calendar_batch_max_size
+        for index, (operation, argument) in enumerate(operations):
+            try:
+                if operation == "read_calendar":
+                    results[index] = self._cached_events(argument)
+                    if results[index] is not None:
+                        continue
+                    request = self._list_request(argument)
+                elif operation == "create_event":
+                    request = self._insert_request(argument)
+                elif operation == "update_event":
+                    request = self._update_request(argument)
+                else:
+                    raise Exception(f"Unsupported calendar batch operation: {operation}")
+            except Exception as e:
+                results[index] = Exception(f"{BATCH_FAILURES.get(operation, 'Failed to run calendar batch')}: {e}")
+                continue
+
+            if not batches or len(batches[-1][1]) >= size:
+                batches.append((self._new_batch(), []))
+            batches[-1][0].add(request, callback=handle, request_id=str(index))
+            batches[-1][1].append(index)
+
+        for batch, indices in batches:
+            try:
+                self._execute(batch, idempotent=all(operations[index][0] != "create_event" for index in indices))
+            except Exception as e:
+                for index in indices:
+                    results[index] = Exception(f"{BATCH_FAILURES[operations[index][0]]}: {e}")
+        return results
+
+    def find_free_slots(self, query: FreeSlotQuery) -> list[CalendarTimeWindow]:
+        start = parse_datetime(query.start)
+        end = parse_datetime(query.end)
+        events = self.read_calendar(CalendarTimeWindow(start=query.start, end=query.end))
+        slots = free_slots([event_bounds(event) for event in events], start, end, query.duration_minutes * 60)
+        return [
+            CalendarTimeWindow(start=_format_datetime(slot_start), end=_format_datetime(slot_end))
+            for slot_start, slot_end in slots
+        ]
+
+    def check_conflicts(self, query: ConflictQuery) -> list[CalendarEvent]:
+        start = parse_datetime(query.start)
+        end = parse_datetime(query.end)
+        conflicts = []
+        for event in self.read_calendar(CalendarTimeWindow(start=query.start, end=query.end)):
+            event_start, event_end = event_bounds(event)
+            if event.id != query.event_id and event_start < end and event_end > start:
+                conflicts.append(event)
+        return conflicts
+
+    def _insert_request(self, event: CalendarEvent) -> Any:
+        return self.service.events().insert(
+            calendarId=settings.email_address,
+            body=event.model_dump(exclude={"status"}, exclude_none=True),
+        )
+
+    def _update_request(self, event: CalendarEvent) -> Any:
+        return self.service.events().update(
+            calendarId=settings.email_address,
+            eventId=event.id,
+            body=event.model_dump(exclude={"status", "id"}, exclude_none=True),
+        )
+
+    def _list_request(self, time_window: CalendarTimeWindow) -> Any:
+        return self.service.events().list(
+            calendarId=settings.email_address,
+            timeMin=time_window.start,
+            timeMax=time_window.end,
+            singleEvents=True,
+            orderBy="startTime",
+        )
+
+    def _new_batch(self) -> BatchHttpRequest:
+        if settings.calendar_api_endpoint:
+            return BatchHttpRequest(batch_uri=urljoin(settings.calendar_api_endpoint, "/batch/calendar/v3"))
+        return self.service.new_batch_http_request()
+
+    def _stored(self, response: dict[str, Any]) -> CalendarEvent:
+        event = CalendarEvent.model_validate(obj=response, extra="ignore")
+        if self.store is not None:
+            self.store.upsert(event)
+        return event
+
+    def _cached_events(self, time_window: CalendarTimeWindow) -> list[CalendarEvent] | None:
+        if self.store is None:
+            return None
+        start = parse_datetime(time_window.start)
+        end = parse_datetime(time_window.end)
+        self._sync()
+        return self.store.query(start, end) if self.store.covers(start) else None
+
+    def _sync(self) -> None:
+        if self.store is None or self.service is None:
+            return
+
+        with self.store.lock:
+            if self.store.is_fresh():
+                return
+
+            if self.store.sync_token is not None:
+                try:
+                    items, sync_token = self._list_all(syncToken=self.store.sync_token)
+                    self.store.apply_changes(items, sync_token)
+                    return
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    logger.info("Calendar sync token expired, performing a full sync")
+                    self.store.invalidate()
+
+            coverage_start = datetime.now(timezone.utc) - timedelta(days=settings.calendar_sync_lookback_days)
+            items, sync_token = self._list_all(timeMin=coverage_start.isoformat())
+            self.store.replace_all(items, sync_token, coverage_start)
+
+    def _list_all(self, **params: Any) -> tuple[list[dict[str, Any]], str]:
+        if self.service is None:
+            raise Exception("Google Calendar service not initialized.")
+
+        items: list[dict[str, Any]] = []
+        page_token = None
+        while True:
+            page = self._execute(
+                self.service.events().list(
                     calendarId=settings.email_address,
-                    timeMin=time_window.start,
-                    timeMax=time_window.end,
                     singleEvents=True,
-                    orderBy="startTime",
+                    pageToken=page_token,
+                    **params,
                 )
-                .execute()
             )
-            return [CalendarEvent.model_validate(obj=event, extra="ignore") for event in events["items"]]
-        except Exception as e:
-            raise Exception(f"Failed to read calendar: {e}") from e
+            items += page.get("items", [])
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return items, page["nextSyncToken"]
+
+
+def _format_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
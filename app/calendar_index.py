@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from .models.calendar_models import CalendarEvent
+
+
+class _CenteredNode:
+    def __init__(
+        self,
+        center: datetime,
+        by_start: list[int],
+        by_end: list[int],
+        left: "_CenteredNode | None",
+        right: "_CenteredNode | None",
+    ):
+        self.center = center
+        self.by_start = by_start
+        self.by_end = by_end
+        self.left = left
+        self.right = right
+
+
+class IntervalIndex:
+    def __init__(self, intervals: list[tuple[datetime, datetime, CalendarEvent]]):
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [start for start, _, _ in intervals]
+        self._ends = [max(start, end) for start, end, _ in intervals]
+        self._events = [event for _, _, event in intervals]
+        self._root = self._build(list(range(len(intervals))))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _build(self, positions: list[int]) -> _CenteredNode | None:
+        if not positions:
+            return None
+        center = self._starts[positions[len(positions) // 2]]
+        here, left, right = [], [], []
+        for i in positions:
+            if self._ends[i] < center:
+                left.append(i)
+            elif self._starts[i] > center:
+                right.append(i)
+            else:
+                here.append(i)
+        by_end = sorted(here, key=lambda i: self._ends[i], reverse=True)
+        return _CenteredNode(center, here, by_end, self._build(left), self._build(right))
+
+    def overlapping(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        matches = []
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+            if end <= node.center:
+                for i in node.by_start:
+                    if self._starts[i] >= end:
+                        break
+                    if self._ends[i] > start:
+                        matches.append(i)
+                nodes.append(node.left)
+            elif start >= node.center:
+                for i in node.by_end:
+                    if self._ends[i] <= start:
+                        break
+                    if self._starts[i] < end:
+                        matches.append(i)
+                nodes.append(node.right)
+            else:
+                matches.extend(node.by_start)
+                nodes.append(node.left)
+                nodes.append(node.right)
+        return [self._events[i] for i in sorted(matches)]
+
+
+def free_slots(
+    busy: list[tuple[datetime, datetime]], start: datetime, end: datetime, min_duration_seconds: float
+) -> list[tuple[datetime, datetime]]:
+    slots = []
+    cursor = start
+    for busy_start, busy_end in sorted(busy):
+        if busy_start > cursor and (busy_start - cursor).total_seconds() >= min_duration_seconds:
+            slots.append((cursor, min(busy_start, end)))
+        cursor = max(cursor, busy_end)
+        if cursor >= end:
+            return slots
+    if (end - cursor).total_seconds() >= min_duration_seconds:
+        slots.append((cursor, end))
+    return slots
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from pydantic import ValidationError
+
+from .calendar_index import IntervalIndex
+from .models.calendar_models import CalendarEvent, DateTimeData
+
+logger = logging.getLogger(__name__)
+
+
+def parse_datetime(value: str, time_zone: str = "UTC") -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=ZoneInfo(time_zone) if time_zone != "UTC" else timezone.utc)
+    return parsed
+
+
+def event_bounds(event: CalendarEvent) -> tuple[datetime, datetime]:
+    return _to_datetime(event.start), _to_datetime(event.end)
+
+
+def _to_datetime(data: DateTimeData) -> datetime:
+    return parse_datetime(data.dateTime or f"{data.date}T00:00:00", data.timeZone)
+
+
+class CalendarEventStore:
+    def __init__(self, max_staleness_seconds: float):
+        self.max_staleness_seconds = max_staleness_seconds
+        self.sync_token: str | None = None
+        self.coverage_start: datetime | None = None
+        self.lock = threading.RLock()
+        self._events: dict[str, CalendarEvent] = {}
+        self._index: IntervalIndex | None = None
+        self._synced_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def is_fresh(self) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at <= self.max_staleness_seconds
+
+    def covers(self, start: datetime) -> bool:
+        return self.coverage_start is not None and start >= self.coverage_start
+
+    def replace_all(self, items: list[dict[str, Any]], sync_token: str, coverage_start: datetime) -> None:
+        with self.lock:
+            self._events.clear()
+            self._index = None
+            self._apply(items)
+            self.sync_token = sync_token
+            self.coverage_start = coverage_start
+            self._synced_at = time.monotonic()
+        logger.info(f"Calendar store fully synced with {len(self._events)} events")
+
+    def apply_changes(self, items: list[dict[str, Any]], sync_token: str) -> None:
+        with self.lock:
+            self._apply(items)
+            self.sync_token = sync_token
+            self._synced_at = time.monotonic()
+        if items:
+            logger.info(f"Calendar store applied {len(items)} incremental changes")
+
+    def upsert(self, event: CalendarEvent) -> None:
+        if event.id is None:
+            return
+        with self.lock:
+            self._events[event.id] = event
+            self._index = None
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self._events.clear()
+            self._index = None
+            self.sync_token = None
+            self.coverage_start = None
+            self._synced_at = None
+
+    def query(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        with self.lock:
+            if self._index is None:
+                self._index = IntervalIndex([(*event_bounds(event), event) for event in self._events.values()])
+            return self._index.overlapping(start, end)
+
+    def _apply(self, items: list[dict[str, Any]]) -> None:
+        if items:
+            self._index = None
+        for item in items:
+            event_id = item.get("id")
+            if event_id is None:
+                continue
+            if item.get("status") == "cancelled":
+                self._events.pop(event_id, None)
+                continue
+            try:
+                self._events[event_id] = CalendarEvent.model_validate(obj=item, extra="ignore")
+            except ValidationError:
+                self._events.pop(event_id, None)
+                logger.debug(f"Skipping calendar event {event_id} without a valid start/end")
@@ -11,6 +11,78 @@ class Settings(BaseSettings):
     email_address: Optional[str] = None
     google_calendar_credentials_json: Optional[str] = None
     elevenlabs_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None
+    elevenlabs_base_url: Optional[str] = None
+    calendar_api_endpoint: Optional[str] = None
+    calendar_anonymous: bool = False
+    server_host: str = "0.0.0.0"
+    server_port: int = 9999
+    server_workers: int = 1
+    session_db_path: Optional[str] = None
+    metrics_loop_lag_interval_seconds: float = 0.5
+    session_max_sessions: int = 1000
+    session_ttl_seconds: float = 3600
+    session_max_bytes: int = 256 * 1024 * 1024
+    session_lease_seconds: float = 300
+    session_lease_wait_seconds: float = 30
+    chain_responses: bool = False
+    router_enabled: bool = True
+    router_small_model: str = "gpt-4.1-mini"
+    router_small_max_chars: dict[str, int] = {"text": 120, "speech": 200}
+    context_budget_tokens: int = 16000
+    context_keep_recent_turns: int = 3
+    context_elide_min_chars: int = 200
+    context_summary_model: str = "gpt-4.1-mini"
+    openai_rate_per_second: float = 50
+    openai_burst: int = 100
+    openai_max_concurrency: int = 64
+    elevenlabs_rate_per_second: float = 10
+    elevenlabs_burst: int = 20
+    elevenlabs_max_concurrency: int = 10
+    calendar_rate_per_second: float = 10
+    calendar_burst: int = 20
+    calendar_max_concurrency: int = 8
+    upstream_queue_timeout_seconds: float = 10
+    upstream_max_retries: int = 3
+    upstream_retry_base_seconds: float = 0.5
+    upstream_retry_max_seconds: float = 8
+    tool_max_workers: int = 8
+    tool_max_concurrency: int = 4
+    tool_timeout_seconds: float = 20
+    tool_timeouts: dict[str, float] = {}
+    tool_result_default_max_tokens: int = 1500
+    tool_result_max_tokens: dict[str, int] = {}
+    stream_coalesce_window_seconds: float = 0.04
+    stream_coalesce_max_chars: int = 256
+    calendar_cache_enabled: bool = True
+    calendar_cache_max_staleness_seconds: float = 30
+    calendar_batch_max_size: int = 50
+    calendar_http_pool_size: int = 8
+    calendar_http_timeout_seconds: float = 10
+    calendar_prewarm: bool = True
+    calendar_token_refresh_margin_seconds: float = 600
+    calendar_token_refresh_retry_seconds: float = 30
+    calendar_sync_lookback_days: int = 30
+    task_store_path: str = "data/tasks.db"
+    task_store_flush_interval_seconds: float = 0.25
+    task_store_batch_size: int = 64
+    task_store_ttl_seconds: float = 7 * 24 * 3600
+    task_store_drop_intermediate_history: bool = True
+    tts_output_format: str = "mp3_44100_128"
+    tts_allowed_formats: list[str] = ["mp3_44100_128", "mp3_22050_32", "opus_48000_32", "opus_48000_64", "pcm_16000"]
+    tts_frame_ms: int = 200
+    audio_stream_ttl_seconds: float = 60
+    tts_cache_enabled: bool = True
+    tts_cache_dir: str | None = "data/tts_cache"
+    tts_cache_memory_bytes: int = 32 * 1024 * 1024
+    tts_cache_disk_bytes: int = 512 * 1024 * 1024
+    tts_max_concurrency: int = 3
+    tts_min_sentence_chars: int = 20
+    tts_min_clause_chars: int = 60
+    tts_backend: str = "http"
+    tts_socket_idle_seconds: float = 60
+    tts_socket_max_connections: int = 256
+    tts_socket_final_timeout_seconds: float = 10
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
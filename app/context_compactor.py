@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Any
+
+from openai import AsyncOpenAI
+from .session_store import Session, estimate_item_size, item_to_dict
+from .upstream import UpstreamLimiter
+
+logger = logging.getLogger(__name__)
+
+ELIDED_OUTPUT = "[elided: stale tool result, call the tool again if you need it]"
+
+SUMMARY_INSTRUCTIONS = """Summarize the conversation below between a user and an AI assistant named Rtos.
+Keep every fact, decision, name, date, time and calendar event id that could matter later, and drop small talk.
+Write plain sentences, no more than 200 words."""
+
+
+def count_tokens(item: Any) -> int:
+    return estimate_item_size(item) // 4 + 1
+
+
+def _render(item: Any) -> str:
+    item = item_to_dict(item)
+    item_type = item.get("type", "message")
+    if item_type == "function_call":
+        return f"assistant called {item.get('name')}({item.get('arguments')})"
+    if item_type == "function_call_output":
+        return f"tool result: {str(item.get('output'))[:500]}"
+    if item_type == "message":
+        content = item.get("content")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        return f"{item.get('role')}: {content}"
+    return f"[{item_type}]"
+
+
+class ContextCompactor:
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        limiter: UpstreamLimiter,
+        budget_tokens: int,
+        keep_recent_turns: int,
+        elide_min_chars: int,
+        summary_model: str,
+    ):
+        self.client = client
+        self.limiter = limiter
+        self.budget_tokens = budget_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.elide_min_chars = elide_min_chars
+        self.summary_model = summary_model
+        self._summaries: dict[str, asyncio.Task] = {}
+
+    def session_tokens(self, session: Session) -> int:
+        return sum(count_tokens(item) for item in session.context)
+
+    def compact(self, session: Session) -> None:
+        tokens = self.session_tokens(session)
+        if tokens <= self.budget_tokens:
+            return
+
+        cut = self._recent_turns_start(session)
+        if cut is None:
+            return
+
+        for i in range(1, cut):
+            item = item_to_dict(session.context[i])
+            if item.get("type") != "function_call_output" or len(str(item.get("output"))) < self.elide_min_chars:
+                continue
+            session.replace(i, {"type": "function_call_output", "call_id": item["call_id"], "output": ELIDED_OUTPUT})
+
+        tokens = self.session_tokens(session)
+        logger.info(f"Session {session.id} compacted to ~{tokens} tokens by eliding stale tool outputs")
+        if tokens > self.budget_tokens and session.id not in self._summaries:
+            self._summaries[session.id] = asyncio.create_task(self._summarize(session, cut))
+
+    def _recent_turns_start(self, session: Session) -> int | None:
+        user_turns = [
+            i for i, item in enumerate(session.context) if isinstance(item, dict) and item.get("role") == "user"
+        ]
+        if len(user_turns) <= self.keep_recent_turns:
+            return None
+        cut = user_turns[-self.keep_recent_turns]
+        if cut > 1 and item_to_dict(session.context[cut - 1]).get("role") == "developer":
+            cut -= 1
+        return cut
+
+    async def _summarize(self, session: Session, cut: int) -> None:
+        try:
+            boundary = session.context[cut - 1]
+            transcript = "\n".join(_render(item) for item in session.context[1:cut])
+            response = await self.limiter.call(
+                lambda: self.client.responses.create(
+                    model=self.summary_model,
+                    instructions=SUMMARY_INSTRUCTIONS,
+                    input=transcript,
+                )
+            )
+
+            async with session.lock:
+                if cut > len(session.context) or session.context[cut - 1] is not boundary:
+                    logger.info(f"Session {session.id} changed during summarization, discarding summary")
+                    return
+                session.replace_range(
+                    1,
+                    cut,
+                    [{"role": "developer", "content": f"Summary of the earlier conversation: {response.output_text}"}],
+                )
+            logger.info(f"Session {session.id} summarized {cut - 1} items to ~{self.session_tokens(session)} tokens")
+        except Exception as e:
+            logger.error(f"Summarizing session {session.id} failed: {e}", exc_info=True)
+        finally:
+            self._summaries.pop(session.id, None)
@@ -0,0 +1,46 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+
+logger = logging.getLogger(__name__)
+
+
+class AuthorizedHttpPool:
+    def __init__(self, credentials: Any, size: int, timeout: float):
+        self.credentials = credentials
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[AuthorizedHttp] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self) -> Iterator[AuthorizedHttp]:
+        self._slots.acquire()
+        try:
+            try:
+                http = self._idle.get_nowait()
+            except queue.Empty:
+                http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+            broken = False
+            try:
+                yield http
+            except (httplib2.HttpLib2Error, OSError):
+                broken = True
+                http.http.close()
+                raise
+            finally:
+                if not broken:
+                    self._idle.put(http)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().http.close()
+            except queue.Empty:
+                return
@@ -0,0 +1,123 @@
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(key, list(counts), total[0]) for key, (counts, total) in sorted(self._series.items())]
+
+        for key, counts, total in series:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._series: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, value in series:
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.label_names, key)))} {value}")
+        return lines
+
+
+REGISTRY: list[Histogram | Counter] = []
+
+REQUEST_SECONDS = Histogram("rtos_request_seconds", "Duration of A2A task execution.", ("mode", "state"))
+ENQUEUE_SECONDS = Histogram("rtos_a2a_enqueue_seconds", "Time spent publishing an A2A status update.", ("kind",))
+MODEL_TTFT_SECONDS = Histogram(
+    "rtos_model_ttft_seconds", "Time from model request to first output token.", ("mode", "model")
+)
+MODEL_TURN_SECONDS = Histogram(
+    "rtos_model_turn_seconds", "Duration of one model turn including its tools.", ("mode", "model")
+)
+ROUTE_DECISIONS = Counter("rtos_route_decisions_total", "Model routing decisions.", ("model", "reason", "mode"))
+TOOL_SECONDS = Histogram("rtos_tool_seconds", "Duration of tool calls.", ("tool", "outcome"))
+CALENDAR_REQUEST_SECONDS = Histogram(
+    "rtos_calendar_request_seconds", "Duration of Google Calendar API requests.", ("method", "outcome")
+)
+TTS_FIRST_BYTE_SECONDS = Histogram("rtos_tts_first_byte_seconds", "Time to first audio byte of a segment.", ("source",))
+TTS_SEGMENT_SECONDS = Histogram("rtos_tts_segment_seconds", "Time to synthesize a whole segment.", ("source",))
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "rtos_event_loop_lag_seconds", "Delay of event loop callbacks past their due time.", buckets=LAG_BUCKETS
+)
+
+
+def render() -> str:
+    return "\n".join(line for histogram in REGISTRY for line in histogram.render()) + "\n"
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(time.perf_counter() - started - interval, 0.0))
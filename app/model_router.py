@@ -0,0 +1,47 @@
+import logging
+import re
+
+from .metrics import ROUTE_DECISIONS
+from .utils.enums import Mode
+
+logger = logging.getLogger(__name__)
+
+TOOL_HINTS = re.compile(
+    r"\b(calendar|schedul\w*|meeting|event|appointment|book|free|busy|available|conflict\w*|move|cancel|"
+    r"reschedul\w*|today|tomorrow|tonight|week|weekend|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"search|look up|news|latest|weather|price|score)\b",
+    re.IGNORECASE,
+)
+
+
+class ModelRouter:
+    def __init__(self, small_model: str, large_model: str, small_max_chars: dict[str, int], enabled: bool):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.small_max_chars = small_max_chars
+        self.enabled = enabled
+
+    def route(self, query: str, mode: Mode, turn: int) -> str:
+        if not self.enabled:
+            model, reason = self.large_model, "disabled"
+        elif turn > 0:
+            model, reason = self.large_model, "tool_use"
+        elif TOOL_HINTS.search(query):
+            model, reason = self.large_model, "tool_hint"
+        elif len(query) > self.small_max_chars.get(mode.value, 0):
+            model, reason = self.large_model, "long_query"
+        else:
+            model, reason = self.small_model, "simple"
+        self.record(model, reason, mode, turn)
+        return model
+
+    def escalate(self, model: str, mode: Mode, turn: int, error: Exception) -> str | None:
+        if model == self.large_model:
+            return None
+        logger.warning(f"{model} failed on turn {turn + 1}, escalating to {self.large_model}: {error}")
+        self.record(self.large_model, "failure", mode, turn)
+        return self.large_model
+
+    def record(self, model: str, reason: str, mode: Mode, turn: int) -> None:
+        logger.info(f"Routing {mode.value} turn {turn + 1} to {model} ({reason})")
+        ROUTE_DECISIONS.inc(model=model, reason=reason, mode=mode.value)
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+
+
+class AudioFormat(BaseModel):
+    name: str = Field(..., description="The ElevenLabs output_format identifier.")
+    mime_type: str = Field(..., description="The MIME type advertised to clients.")
+    bytes_per_second: int = Field(..., description="Nominal encoded bytes per second of audio.")
+
+
+AUDIO_FORMATS: dict[str, AudioFormat] = {
+    audio_format.name: audio_format
+    for audio_format in [
+        AudioFormat(name="mp3_44100_128", mime_type="audio/mpeg", bytes_per_second=16000),
+        AudioFormat(name="mp3_22050_32", mime_type="audio/mpeg", bytes_per_second=4000),
+        AudioFormat(name="opus_48000_32", mime_type="audio/ogg; codecs=opus", bytes_per_second=4000),
+        AudioFormat(name="opus_48000_64", mime_type="audio/ogg; codecs=opus", bytes_per_second=8000),
+        AudioFormat(name="pcm_16000", mime_type="audio/pcm; rate=16000", bytes_per_second=32000),
+        AudioFormat(name="pcm_24000", mime_type="audio/pcm; rate=24000", bytes_per_second=48000),
+        AudioFormat(name="ulaw_8000", mime_type="audio/basic", bytes_per_second=8000),
+    ]
+}
@@ -1,11 +1,18 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 
 
 class DateTimeData(BaseModel):
-    dateTime: str = Field(..., description="Time formatted according to ISO: YYYY-MM-DD HH:MM:SS.")
+    dateTime: Optional[str] = Field(default=None, description="Time formatted according to ISO: YYYY-MM-DD HH:MM:SS.")
+    date: Optional[str] = Field(default=None, description="Date of an all-day event: YYYY-MM-DD.")
     timeZone: str = Field(default="UTC", description="Timezone code.")
 
+    @model_validator(mode="after")
+    def require_date_or_time(self) -> "DateTimeData":
+        if self.dateTime is None and self.date is None:
+            raise ValueError("Either dateTime or date is required.")
+        return self
+
 
 class CalendarEvent(BaseModel):
     id: Optional[str] = Field(default=None, description="The unique identifier of the event.")
@@ -20,3 +27,15 @@ class CalendarEvent(BaseModel):
 class CalendarTimeWindow(BaseModel):
     start: str = Field(..., description="The start of the calendar time window.")
     end: str = Field(..., description="The end of the calendar time window.")
+
+
+class ConflictQuery(BaseModel):
+    start: str = Field(..., description="The start of the proposed time.")
+    end: str = Field(..., description="The end of the proposed time.")
+    event_id: Optional[str] = Field(default=None, description="The event being moved, ignored as a conflict.")
+
+
+class FreeSlotQuery(BaseModel):
+    start: str = Field(..., description="The start of the time window to search.")
+    end: str = Field(..., description="The end of the time window to search.")
+    duration_minutes: int = Field(..., description="The minimum length of a free slot in minutes.")
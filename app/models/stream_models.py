@@ -10,9 +10,13 @@ class ToolCallEvent(BaseModel):
     name: str
 
 
+class TranscriptEvent(BaseModel):
+    text: str
+
+
 class AudioChunk(BaseModel):
-    data: str  # base64-encoded audio bytes
+    data: bytes
     mime_type: str = "audio/mpeg"
 
 
-StreamEvent = Union[TextChunk, ToolCallEvent, AudioChunk]
+StreamEvent = Union[TextChunk, ToolCallEvent, TranscriptEvent, AudioChunk]
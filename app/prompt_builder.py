@@ -0,0 +1,58 @@
+import logging
+from datetime import datetime
+from typing import Any
+
+from .session_store import Session
+from .utils.enums import Mode
+
+logger = logging.getLogger(__name__)
+
+TEXT_SYSTEM_PROMPT = """You are an AI assistant named Rtos (pronounced ar-tohs), 
+be ready to answer the user's questions or perform actions via the tools you have available. 
+The current date and time are given in a developer message right before each user message."""
+
+SPEECH_SYSTEM_PROMPT = """You are an AI assistant named Rtos (pronounced art-ohs), 
+be ready to answer the user's questions or perform actions via the tools you have available. 
+The current date and time are given in a developer message right before each user message. You are responding via speech mode. This means that your
+answers will be spoken out loud. Because of this, make sure that your answer emulates spoken language.
+Avoid using written elements that you would not find in spoken language (like urls or emojis), and that all acroyms are written out 
+in plain language instead."""
+
+
+class PromptBuilder:
+    def __init__(self, tools: list[dict[str, Any]], chain_responses: bool):
+        self.tools = tools
+        self.chain_responses = chain_responses
+
+    def system_prompt(self, mode: Mode) -> str:
+        return SPEECH_SYSTEM_PROMPT if mode == Mode.SPEECH else TEXT_SYSTEM_PROMPT
+
+    def user_turn(self, query: str) -> list[dict[str, str]]:
+        now = datetime.now().astimezone()
+        return [
+            {"role": "developer", "content": f"Current date and time: {now.strftime('%A %Y-%m-%d %H:%M (UTC%z)')}"},
+            {"role": "user", "content": query},
+        ]
+
+    def request(self, session: Session) -> dict[str, Any]:
+        if self.chain_responses and session.previous_response_id is not None:
+            return {
+                "input": session.context[session.sent_items :],
+                "previous_response_id": session.previous_response_id,
+                "tools": self.tools,
+                "prompt_cache_key": session.id,
+            }
+        return {
+            "input": session.context,
+            "tools": self.tools,
+            "prompt_cache_key": session.id,
+        }
+
+
+def log_cache_usage(session: Session, usage: Any) -> None:
+    if usage is None:
+        return
+    input_tokens = usage.input_tokens
+    cached_tokens = usage.input_tokens_details.cached_tokens if usage.input_tokens_details else 0
+    ratio = cached_tokens / input_tokens if input_tokens else 0.0
+    logger.info(f"Session {session.id} prompt cache: {cached_tokens}/{input_tokens} input tokens cached ({ratio:.0%})")
@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+from uuid import uuid4
+
+from .session_store import Session, item_to_dict
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    context TEXT NOT NULL,
+    previous_response_id TEXT,
+    sent_items INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS session_leases (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SqliteSessionBackend:
+    def __init__(self, path: str, ttl_seconds: float, lease_seconds: float, lease_wait_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.lease_wait_seconds = lease_wait_seconds
+        self._owner = f"{os.getpid()}-{uuid4().hex}"
+        self._lock = threading.Lock()
+        self._last_gc = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def lease(self, session_id: str) -> None:
+        deadline = time.monotonic() + self.lease_wait_seconds
+        while True:
+            now = time.time()
+            with self._lock, self._connection:
+                cursor = self._connection.execute(
+                    "INSERT INTO session_leases (id, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                    "WHERE session_leases.expires_at < ? OR session_leases.owner = excluded.owner",
+                    (session_id, self._owner, now + self.lease_seconds, now),
+                )
+            if cursor.rowcount == 1:
+                return
+            if time.monotonic() >= deadline:
+                raise Exception(f"Session {session_id} is busy in another worker")
+            time.sleep(0.05)
+
+    def release(self, session_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM session_leases WHERE id = ? AND owner = ?", (session_id, self._owner))
+
+    def load(self, session: Session) -> None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version, context, previous_response_id, sent_items FROM sessions WHERE id = ? AND version > ?",
+                (session.id, session.version),
+            ).fetchone()
+        if row is None:
+            return
+
+        version, context, previous_response_id, sent_items = row
+        session.restore(json.loads(context), previous_response_id, sent_items, version)
+        logger.info(f"Loaded session {session.id} at version {version}")
+
+    def save(self, session: Session) -> None:
+        context: list[Any] = [item_to_dict(item) for item in session.context]
+        values = (json.dumps(context, default=str), session.previous_response_id, session.sent_items, time.time())
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE sessions SET version = version + 1, context = ?, previous_response_id = ?, sent_items = ?, "
+                "updated_at = ? WHERE id = ? AND version = ?",
+                (*values, session.id, session.version),
+            )
+            if cursor.rowcount == 0:
+                cursor = self._connection.execute(
+                    "INSERT INTO sessions (id, version, context, previous_response_id, sent_items, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO NOTHING",
+                    (session.id, session.version + 1, *values),
+                )
+            if cursor.rowcount == 0:
+                raise Exception(f"Session {session.id} was updated by another worker, this turn was not saved")
+            session.version += 1
+            if time.monotonic() - self._last_gc > self.ttl_seconds / 10:
+                self._last_gc = time.monotonic()
+                self._connection.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
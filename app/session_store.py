@@ -0,0 +1,160 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from .session_backend import SqliteSessionBackend
+
+logger = logging.getLogger(__name__)
+
+
+def item_to_dict(item: Any) -> Any:
+    return item.model_dump(exclude_none=True) if isinstance(item, BaseModel) else item
+
+
+def estimate_item_size(item: Any) -> int:
+    if isinstance(item, BaseModel):
+        return len(item.model_dump_json())
+    return len(json.dumps(item, default=str))
+
+
+class Session:
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.context: list[Any] = [{"role": "__system__", "content": "__content__"}]
+        self.lock = asyncio.Lock()
+        self.last_access = time.monotonic()
+        self.size = 0
+        self.previous_response_id: str | None = None
+        self.sent_items = 0
+        self.version = 0
+
+    def restore(self, context: list[Any], previous_response_id: str | None, sent_items: int, version: int) -> None:
+        self.context = context
+        self.size = sum(estimate_item_size(item) for item in context)
+        self.previous_response_id = previous_response_id
+        self.sent_items = sent_items
+        self.version = version
+
+    def append(self, item: Any) -> None:
+        self.context.append(item)
+        self.size += estimate_item_size(item)
+
+    def extend(self, items: list[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def replace(self, index: int, item: Any) -> None:
+        self.size += estimate_item_size(item) - estimate_item_size(self.context[index])
+        self.context[index] = item
+        self.reset_response_chain()
+
+    def replace_range(self, start: int, end: int, items: list[Any]) -> None:
+        self.size -= sum(estimate_item_size(item) for item in self.context[start:end])
+        self.size += sum(estimate_item_size(item) for item in items)
+        self.context[start:end] = items
+        self.reset_response_chain()
+
+    def mark_sent(self, response_id: str) -> None:
+        self.previous_response_id = response_id
+        self.sent_items = len(self.context)
+
+    def reset_response_chain(self) -> None:
+        self.previous_response_id = None
+        self.sent_items = 0
+
+    def set_system_prompt(self, content: str) -> None:
+        if self.context[0].get("content") == content:
+            return
+        self.reset_response_chain()
+        self.size -= estimate_item_size(self.context[0])
+        self.context[0] = {"role": "system", "content": content}
+        self.size += estimate_item_size(self.context[0])
+
+
+class SessionStore:
+    def __init__(
+        self,
+        max_sessions: int,
+        ttl_seconds: float,
+        max_bytes: int,
+        backend: "SqliteSessionBackend | None" = None,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Session:
+        self._evict_expired()
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = Session(session_id)
+            self._sessions[session_id] = session
+            logger.info(f"Created session {session_id} ({len(self._sessions)} active)")
+        else:
+            self._sessions.move_to_end(session_id)
+
+        session.last_access = time.monotonic()
+        self._evict_over_capacity(keep=session_id)
+        return session
+
+    @asynccontextmanager
+    async def acquire(self, session_id: str) -> AsyncIterator[Session]:
+        session = self.get(session_id)
+        async with session.lock:
+            if self.backend is None:
+                try:
+                    yield session
+                finally:
+                    session.last_access = time.monotonic()
+                    self._evict_over_capacity()
+                return
+
+            await asyncio.to_thread(self.backend.lease, session_id)
+            try:
+                await asyncio.to_thread(self.backend.load, session)
+                try:
+                    yield session
+                finally:
+                    await asyncio.to_thread(self.backend.save, session)
+            finally:
+                await asyncio.to_thread(self.backend.release, session_id)
+                session.last_access = time.monotonic()
+                self._evict_over_capacity()
+
+    def total_size(self) -> int:
+        return sum(session.size for session in self._sessions.values())
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            session_id
+            for session_id, session in self._sessions.items()
+            if now - session.last_access > self.ttl_seconds and not session.lock.locked()
+        ]
+        for session_id in expired:
+            logger.info(f"Evicting expired session {session_id}")
+            del self._sessions[session_id]
+
+    def _evict_over_capacity(self, keep: str | None = None) -> None:
+        total_size = self.total_size()
+        for session_id, session in list(self._sessions.items()):
+            if len(self._sessions) <= self.max_sessions and total_size <= self.max_bytes:
+                break
+            if session_id == keep or session.lock.locked():
+                continue
+            logger.info(f"Evicting least recently used session {session_id} ({session.size} bytes)")
+            total_size -= session.size
+            del self._sessions[session_id]
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import re
+from collections import deque
+from typing import AsyncIterator, Callable
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_BOUNDARY = re.compile(r"(?P<sentence>[.!?]+[\"')\]]*\s+|\n+)|(?P<clause>[,;:]\s+)")
+
+SegmentItem = bytes | BaseException | None
+
+
+class SentenceSegmenter:
+    def __init__(self, min_sentence_chars: int, min_clause_chars: int):
+        self.min_sentence_chars = min_sentence_chars
+        self.min_clause_chars = min_clause_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> list[str]:
+        self._buffer += delta
+        segments = []
+        start = 0
+        for match in SEGMENT_BOUNDARY.finditer(self._buffer):
+            length = match.end() - start
+            if (match.group("sentence") and length >= self.min_sentence_chars) or (
+                match.group("clause") and length >= self.min_clause_chars
+            ):
+                segment = self._buffer[start : match.end()].strip()
+                if segment:
+                    segments.append(segment)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return segments
+
+    def flush(self) -> str | None:
+        segment = self._buffer.strip()
+        self._buffer = ""
+        return segment or None
+
+
+class AudioReframer:
+    def __init__(self, frame_bytes: int):
+        self.frame_bytes = frame_bytes
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        self._buffer += chunk
+        frames = []
+        while len(self._buffer) >= self.frame_bytes:
+            frames.append(bytes(self._buffer[: self.frame_bytes]))
+            del self._buffer[: self.frame_bytes]
+        return frames
+
+    def flush(self) -> bytes | None:
+        frame = bytes(self._buffer)
+        self._buffer.clear()
+        return frame or None
+
+
+class SpeechPipeline:
+    def __init__(
+        self,
+        synthesize: Callable[[str, str | None], AsyncIterator[bytes]],
+        max_concurrency: int,
+        segmenter: SentenceSegmenter,
+    ):
+        self._synthesize = synthesize
+        self._segmenter = segmenter
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._segments: deque[asyncio.Queue[SegmentItem]] = deque()
+        self._tasks: list[asyncio.Task] = []
+        self._previous_text: str | None = None
+
+    def feed(self, delta: str) -> None:
+        for segment in self._segmenter.feed(delta):
+            self.submit(segment)
+
+    def finish(self) -> None:
+        tail = self._segmenter.flush()
+        if tail:
+            self.submit(tail)
+
+    def submit(self, text: str) -> None:
+        queue: asyncio.Queue[SegmentItem] = asyncio.Queue()
+        self._segments.append(queue)
+        self._tasks.append(asyncio.create_task(self._run(text, self._previous_text, queue)))
+        self._previous_text = text
+
+    async def _run(self, text: str, previous_text: str | None, queue: asyncio.Queue[SegmentItem]) -> None:
+        try:
+            async with self._semaphore:
+                async for chunk in self._synthesize(text, previous_text):
+                    queue.put_nowait(chunk)
+        except Exception as e:
+            logger.error(f"Speech synthesis failed for segment: {text[:20]}...", exc_info=True)
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(None)
+
+    def drain_nowait(self) -> list[bytes]:
+        chunks = []
+        while self._segments:
+            head = self._segments[0]
+            if head.empty():
+                break
+            item = head.get_nowait()
+            if item is None:
+                self._segments.popleft()
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                chunks.append(item)
+        return chunks
+
+    async def drain(self) -> AsyncIterator[bytes]:
+        while self._segments:
+            item = await self._segments[0].get()
+            if item is None:
+                self._segments.popleft()
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._segments.clear()
@@ -0,0 +1,59 @@
+import asyncio
+from typing import AsyncGenerator, AsyncIterator
+
+from .models.stream_models import StreamEvent, TextChunk
+
+
+async def coalesce_text(
+    stream: AsyncGenerator[StreamEvent, None], window_seconds: float, max_chars: int
+) -> AsyncIterator[StreamEvent]:
+    loop = asyncio.get_running_loop()
+    buffer: list[str] = []
+    buffered_chars = 0
+    deadline = 0.0
+    next_event: asyncio.Future[StreamEvent] | None = None
+
+    try:
+        while True:
+            if next_event is None:
+                next_event = asyncio.ensure_future(anext(stream))
+
+            if buffer:
+                done, _ = await asyncio.wait({next_event}, timeout=max(deadline - loop.time(), 0))
+                if not done:
+                    yield TextChunk(text="".join(buffer))
+                    buffer.clear()
+                    buffered_chars = 0
+                    continue
+
+            try:
+                event = await next_event
+            except StopAsyncIteration:
+                break
+            finally:
+                next_event = None
+
+            if isinstance(event, TextChunk):
+                if not buffer:
+                    deadline = loop.time() + window_seconds
+                buffer.append(event.text)
+                buffered_chars += len(event.text)
+                if buffered_chars >= max_chars:
+                    yield TextChunk(text="".join(buffer))
+                    buffer.clear()
+                    buffered_chars = 0
+                continue
+
+            if buffer:
+                yield TextChunk(text="".join(buffer))
+                buffer.clear()
+                buffered_chars = 0
+            yield event
+
+        if buffer:
+            yield TextChunk(text="".join(buffer))
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+            await asyncio.gather(next_event, return_exceptions=True)
+        await stream.aclose()
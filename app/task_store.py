@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Role, Task
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    context_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updated_at);
+"""
+
+
+class SqliteTaskStore(TaskStore):
+    def __init__(
+        self,
+        path: str,
+        flush_interval_seconds: float,
+        batch_size: int,
+        ttl_seconds: float,
+        drop_intermediate_history: bool,
+    ):
+        self.path = path
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = batch_size
+        self.ttl_seconds = ttl_seconds
+        self.drop_intermediate_history = drop_intermediate_history
+        self._pending: dict[str, Task] = {}
+        self._writing: dict[str, Task] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flushing: asyncio.Task | None = None
+        self._last_gc = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        if self.drop_intermediate_history and task.history:
+            task = task.model_copy(
+                update={"history": [message for message in task.history if message.role == Role.user]}
+            )
+
+        self._pending[task.id] = task
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_interval_seconds, self._schedule_flush
+            )
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        task = self._pending.get(task_id) or self._writing.get(task_id)
+        if task is not None:
+            return task
+        data = await self._run(self._select, task_id)
+        return Task.model_validate_json(data) if data else None
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        self._pending.pop(task_id, None)
+        self._writing.pop(task_id, None)
+        await self._run(self._delete, task_id)
+
+    async def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        self._writing.update(batch)
+        rows = [
+            (task.id, task.context_id, task.status.state.value, task.model_dump_json(), time.time())
+            for task in batch.values()
+        ]
+        try:
+            await self._run(self._write, rows)
+        finally:
+            for task_id, task in batch.items():
+                if self._writing.get(task_id) is task:
+                    del self._writing[task_id]
+
+        if time.monotonic() - self._last_gc > self.ttl_seconds / 10:
+            self._last_gc = time.monotonic()
+            await self._run(self._collect_garbage)
+
+    async def close(self) -> None:
+        if self._flushing is not None:
+            await self._flushing
+        await self.flush()
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=True)
+
+    def _schedule_flush(self) -> None:
+        self._flush_handle = None
+        self._flushing = asyncio.create_task(self.flush())
+        self._flushing.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Flushing tasks to {self.path} failed", exc_info=task.exception())
+
+    def _write(self, rows: list[tuple]) -> None:
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT INTO tasks (id, context_id, state, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET context_id = excluded.context_id, state = excluded.state, "
+                "data = excluded.data, updated_at = excluded.updated_at",
+                rows,
+            )
+
+    def _select(self, task_id: str) -> str | None:
+        row = self._connect().execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def _delete(self, task_id: str) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def _collect_garbage(self) -> None:
+        connection = self._connect()
+        with connection:
+            deleted = connection.execute(
+                "DELETE FROM tasks WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        if deleted:
+            logger.info(f"Removed {deleted} expired tasks from {self.path}")
@@ -0,0 +1,67 @@
+from .models.calendar_models import CalendarEvent, CalendarTimeWindow
+
+EVENT_COLUMNS = ["id", "summary", "start", "end", "location", "description"]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _cell(value: str | None) -> str:
+    if value is None:
+        return ""
+    return value.replace("|", "/").replace("\n", " ")
+
+
+def _event_row(event: CalendarEvent) -> dict[str, str | None]:
+    return {
+        "id": event.id,
+        "summary": event.summary,
+        "start": event.start.dateTime or event.start.date,
+        "end": event.end.dateTime or event.end.date,
+        "location": event.location,
+        "description": event.description,
+    }
+
+
+def encode_event(event: CalendarEvent) -> str:
+    return event.model_dump_json(exclude_none=True, exclude={"status"})
+
+
+def encode_events(events: list[CalendarEvent], max_tokens: int, tool_name: str) -> str:
+    if not events:
+        return "No events in this window."
+
+    rows = [_event_row(event) for event in events]
+    columns = [column for column in EVENT_COLUMNS if any(row[column] is not None for row in rows)]
+    lines = ["|".join(columns)]
+    used_tokens = estimate_tokens(lines[0])
+
+    for i, row in enumerate(rows):
+        line = "|".join(_cell(row[column]) for column in columns)
+        used_tokens += estimate_tokens(line)
+        if used_tokens > max_tokens and i > 0:
+            lines.append(
+                f"... {len(rows) - i} more events omitted. Call {tool_name} again with start={row['start']} to see the rest."
+            )
+            break
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+def encode_time_windows(windows: list[CalendarTimeWindow], max_tokens: int) -> str:
+    lines = ["start|end"]
+    used_tokens = estimate_tokens(lines[0])
+
+    for i, window in enumerate(windows):
+        line = f"{window.start}|{window.end}"
+        used_tokens += estimate_tokens(line)
+        if used_tokens > max_tokens and i > 0:
+            lines.append(
+                f"... {len(windows) - i} more slots omitted. Search again with start={window.start} to see the rest."
+            )
+            break
+        lines.append(line)
+
+    return "\n".join(lines)
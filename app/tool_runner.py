@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Collection
+
+logger = logging.getLogger(__name__)
+
+
+class ToolRunner:
+    def __init__(
+        self,
+        call_function: Callable[[str, str], str],
+        validate_arguments: Callable[[str, str], str | None],
+        max_workers: int,
+        max_concurrency: int,
+        default_timeout: float,
+        timeouts: dict[str, float] | None = None,
+        call_batch: Callable[[list[tuple[str, str]]], list[str]] | None = None,
+        batchable: Collection[str] = (),
+    ):
+        self.call_function = call_function
+        self.validate_arguments = validate_arguments
+        self.call_batch = call_batch
+        self.batchable = frozenset(batchable) if call_batch is not None else frozenset()
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    async def run(self, name: str, args: str) -> str:
+        loop = asyncio.get_running_loop()
+        timeout = self.timeouts.get(name, self.default_timeout)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._pool, self.call_function, name, args), timeout)
+        except asyncio.TimeoutError:
+            return self._timed_out(name, timeout)
+
+    async def run_batch(self, calls: list[tuple[str, str]]) -> list[str]:
+        if self.call_batch is None:
+            raise Exception("Tool batching is not configured")
+        loop = asyncio.get_running_loop()
+        timeout = max(self.timeouts.get(name, self.default_timeout) for name, _ in calls)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._pool, self.call_batch, calls), timeout)
+        except asyncio.TimeoutError:
+            return [self._timed_out(name, timeout) for name, _ in calls]
+
+    def dispatch(self) -> "ToolDispatch":
+        return ToolDispatch(self)
+
+    def run_many_sync(self, calls: list[tuple[str, str]]) -> list[str]:
+        batched = [index for index, (name, _) in enumerate(calls) if name in self.batchable]
+        if len(batched) < 2:
+            batched = []
+        batch = self._pool.submit(self.call_batch, [calls[index] for index in batched]) if batched else None
+        futures = {
+            index: self._pool.submit(self.call_function, name, args)
+            for index, (name, args) in enumerate(calls)
+            if index not in batched
+        }
+
+        results: list[str] = [""] * len(calls)
+        for index, future in futures.items():
+            name = calls[index][0]
+            timeout = self.timeouts.get(name, self.default_timeout)
+            try:
+                results[index] = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                results[index] = self._timed_out(name, timeout)
+        if batch is not None:
+            timeout = max(self.timeouts.get(calls[index][0], self.default_timeout) for index in batched)
+            try:
+                batch_results = batch.result(timeout=timeout)
+            except FutureTimeoutError:
+                batch_results = [self._timed_out(calls[index][0], timeout) for index in batched]
+            for index, result in zip(batched, batch_results):
+                results[index] = result
+        return results
+
+    def _timed_out(self, name: str, timeout: float) -> str:
+        logger.error(f"Tool call to {name} timed out after {timeout}s")
+        return f"Tool call to {name} timed out. Either try a different tool or tell the user you are unable to complete their request right now."
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ToolDispatch:
+    def __init__(self, runner: ToolRunner):
+        self._runner = runner
+        self._semaphore = asyncio.Semaphore(runner.max_concurrency)
+        self._pending: dict[str, asyncio.Task[str]] = {}
+        self._deferred: dict[str, tuple[str, str]] = {}
+        self._batches: list[asyncio.Task[list[str]]] = []
+        self._batchable_started = False
+
+    def started(self, call_id: str) -> bool:
+        return call_id in self._pending or call_id in self._deferred
+
+    def start(self, call_id: str, name: str, args: str, early: bool = True) -> None:
+        if self.started(call_id):
+            return
+        if name in self._runner.batchable:
+            if early and not self._batchable_started:
+                self._batchable_started = True
+            else:
+                self._deferred[call_id] = (name, args)
+                return
+        self._pending[call_id] = asyncio.create_task(self._run_bounded(name, args))
+
+    async def _run_bounded(self, name: str, args: str) -> str:
+        error = self._runner.validate_arguments(name, args)
+        if error:
+            return error
+        async with self._semaphore:
+            return await self._runner.run(name, args)
+
+    def _start_deferred(self) -> None:
+        deferred, self._deferred = self._deferred, {}
+        if len(deferred) < 2:
+            for call_id, (name, args) in deferred.items():
+                self._pending[call_id] = asyncio.create_task(self._run_bounded(name, args))
+            return
+
+        batch = asyncio.create_task(self._run_batch(list(deferred.values())))
+        self._batches.append(batch)
+        for index, call_id in enumerate(deferred):
+            self._pending[call_id] = asyncio.create_task(self._batch_result(batch, index))
+
+    async def _run_batch(self, calls: list[tuple[str, str]]) -> list[str]:
+        results = [self._runner.validate_arguments(name, args) for name, args in calls]
+        valid = [index for index, error in enumerate(results) if not error]
+        if valid:
+            async with self._semaphore:
+                for index, result in zip(valid, await self._runner.run_batch([calls[index] for index in valid])):
+                    results[index] = result
+        return [result or "" for result in results]
+
+    async def _batch_result(self, batch: asyncio.Task[list[str]], index: int) -> str:
+        return (await asyncio.shield(batch))[index]
+
+    async def results(self, tool_calls: list[Any]) -> list[str]:
+        for tool_call in tool_calls:
+            self.start(tool_call.call_id, tool_call.name, tool_call.arguments, early=False)
+        self._start_deferred()
+        return await asyncio.gather(*(self._pending[tool_call.call_id] for tool_call in tool_calls))
+
+    async def close(self) -> None:
+        tasks = [*self._pending.values(), *self._batches]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
+        self._deferred.clear()
+        self._batches.clear()
@@ -127,3 +127,59 @@ def update_event_tool() -> dict[str, Any]:
             "additionalProperties": False,
         },
     }
+
+
+def find_free_slots_tool() -> dict[str, Any]:
+    return {
+        "type": "function",
+        "name": "find_free_slots",
+        "description": "Find the free slots in the user's calendar within a time window [start, end] that are at least duration_minutes long. Use this instead of reading the calendar when you need to find time for something.",
+        "strict": True,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "start": {
+                    "type": "string",
+                    "description": "The start of the time window to search in RFC3339 format: YYYY-MM-DDTHH:MM:SSZ.",
+                },
+                "end": {
+                    "type": "string",
+                    "description": "The end of the time window to search in RFC3339 format: YYYY-MM-DDTHH:MM:SSZ.",
+                },
+                "duration_minutes": {
+                    "type": "integer",
+                    "description": "The minimum length of a free slot in minutes.",
+                },
+            },
+            "required": ["start", "end", "duration_minutes"],
+            "additionalProperties": False,
+        },
+    }
+
+
+def check_conflicts_tool() -> dict[str, Any]:
+    return {
+        "type": "function",
+        "name": "check_conflicts",
+        "description": "Check which events in the user's calendar clash with a proposed time [start, end]. Use this before scheduling or moving an event; when moving one, pass its id so it is not reported as clashing with itself.",
+        "strict": True,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "start": {
+                    "type": "string",
+                    "description": "The start of the proposed time in RFC3339 format: YYYY-MM-DDTHH:MM:SSZ.",
+                },
+                "end": {
+                    "type": "string",
+                    "description": "The end of the proposed time in RFC3339 format: YYYY-MM-DDTHH:MM:SSZ.",
+                },
+                "event_id": {
+                    "type": ["string", "null"],
+                    "description": "The id of the event being moved, or null when scheduling a new event.",
+                },
+            },
+            "required": ["start", "end", "event_id"],
+            "additionalProperties": False,
+        },
+    }
@@ -0,0 +1,255 @@
+import asyncio
+import base64
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed
+
+from .metrics import TTS_FIRST_BYTE_SECONDS, TTS_SEGMENT_SECONDS
+from .speech_pipeline import SegmentItem, SentenceSegmenter
+from .upstream import UpstreamLimiter, UpstreamOverloaded
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "wss://api.elevenlabs.io"
+MAX_INACTIVITY_SECONDS = 180
+
+
+def websocket_url(base_url: str | None, voice_id: str, model_id: str, output_format: str, idle_seconds: float) -> str:
+    base = (base_url or DEFAULT_BASE_URL).rstrip("/")
+    if base.startswith("http"):
+        base = "ws" + base[len("http") :]
+    query = urlencode(
+        {
+            "model_id": model_id,
+            "output_format": output_format,
+            "inactivity_timeout": int(min(max(idle_seconds, 1), MAX_INACTIVITY_SECONDS)),
+        }
+    )
+    return f"{base}/v1/text-to-speech/{voice_id}/multi-stream-input?{query}"
+
+
+class SpeechSocket:
+    def __init__(self, connection: ClientConnection):
+        self.connection = connection
+        self.contexts: dict[str, asyncio.Queue[SegmentItem]] = {}
+        self.last_used = time.monotonic()
+        self._reader = asyncio.create_task(self._read())
+
+    @property
+    def closed(self) -> bool:
+        return self._reader.done()
+
+    async def send(self, message: dict[str, Any]) -> None:
+        self.last_used = time.monotonic()
+        await self.connection.send(json.dumps(message))
+
+    async def _read(self) -> None:
+        error: BaseException = ConnectionError("ElevenLabs WebSocket closed")
+        try:
+            async for raw in self.connection:
+                message = json.loads(raw)
+                queue = self.contexts.get(message.get("contextId") or message.get("context_id") or "")
+                if queue is None:
+                    continue
+                if message.get("error"):
+                    queue.put_nowait(Exception(f"ElevenLabs WebSocket error: {message['error']}"))
+                if message.get("audio"):
+                    queue.put_nowait(base64.b64decode(message["audio"]))
+                if message.get("isFinal"):
+                    queue.put_nowait(None)
+        except ConnectionClosed as e:
+            error = ConnectionError(f"ElevenLabs WebSocket closed: {e}")
+        except Exception as e:
+            logger.error("Failed to read from ElevenLabs WebSocket", exc_info=True)
+            error = e
+        finally:
+            for queue in self.contexts.values():
+                queue.put_nowait(error)
+
+    async def close(self) -> None:
+        try:
+            await self.connection.send(json.dumps({"close_socket": True}))
+        except ConnectionClosed:
+            pass
+        await self.connection.close()
+        await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class SocketSpeech:
+    def __init__(
+        self, socket: SpeechSocket, segmenter: SentenceSegmenter, final_timeout: float, limiter: UpstreamLimiter
+    ):
+        self.context_id = uuid4().hex
+        self._socket = socket
+        self._segmenter = segmenter
+        self._final_timeout = final_timeout
+        self._limiter = limiter
+        self._audio: asyncio.Queue[SegmentItem] = asyncio.Queue()
+        self._outgoing: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        self._writer: asyncio.Task | None = None
+        self._started = time.perf_counter()
+        self._first_byte = False
+        self._finished = False
+        self._done = False
+        socket.contexts[self.context_id] = self._audio
+
+    def _send(self, message: dict[str, Any]) -> None:
+        if self._writer is None:
+            self._started = time.perf_counter()
+            self._outgoing.put_nowait({"text": " ", "context_id": self.context_id})
+            self._writer = asyncio.create_task(self._write())
+        self._outgoing.put_nowait({**message, "context_id": self.context_id})
+
+    async def _write(self) -> None:
+        try:
+            async with self._limiter.slot():
+                while (message := await self._outgoing.get()) is not None:
+                    await self._socket.send(message)
+        except Exception as e:
+            logger.error("Failed to send text to ElevenLabs WebSocket", exc_info=True)
+            self._audio.put_nowait(e)
+
+    def feed(self, delta: str) -> None:
+        if self._segmenter.feed(delta):
+            self._send({"text": delta, "flush": True})
+        else:
+            self._send({"text": delta})
+
+    def finish(self) -> None:
+        self._segmenter.flush()
+        self._finished = True
+        self._send({"flush": True})
+        self._send({"close_context": True})
+
+    def _take(self, item: SegmentItem) -> bytes | None:
+        if item is None:
+            self._done = True
+            TTS_SEGMENT_SECONDS.observe(time.perf_counter() - self._started, source="websocket")
+            return None
+        if isinstance(item, BaseException):
+            self._done = True
+            raise item
+        if not self._first_byte:
+            self._first_byte = True
+            TTS_FIRST_BYTE_SECONDS.observe(time.perf_counter() - self._started, source="websocket")
+        return item
+
+    def drain_nowait(self) -> list[bytes]:
+        chunks = []
+        while not self._done and not self._audio.empty():
+            chunk = self._take(self._audio.get_nowait())
+            if chunk is not None:
+                chunks.append(chunk)
+        return chunks
+
+    async def drain(self) -> AsyncIterator[bytes]:
+        while self._writer is not None and not self._done:
+            try:
+                item = await asyncio.wait_for(self._audio.get(), self._final_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"No audio from ElevenLabs WebSocket for {self._final_timeout}s, ending reply audio")
+                self._done = True
+                return
+            chunk = self._take(item)
+            if chunk is not None:
+                yield chunk
+
+    async def close(self) -> None:
+        try:
+            if self._writer is None:
+                return
+            if not self._finished:
+                self._finished = True
+                self._send({"close_context": True})
+            self._outgoing.put_nowait(None)
+            await asyncio.wait_for(self._writer, self._final_timeout)
+        except Exception:
+            logger.warning(f"Could not close ElevenLabs WebSocket context {self.context_id} cleanly")
+        finally:
+            self._socket.contexts.pop(self.context_id, None)
+
+
+class SpeechSocketPool:
+    def __init__(
+        self,
+        limiter: UpstreamLimiter,
+        api_key: str | None,
+        base_url: str | None,
+        voice_id: str,
+        model_id: str,
+        idle_seconds: float,
+        max_sockets: int,
+        final_timeout: float,
+    ):
+        self.limiter = limiter
+        self.api_key = api_key
+        self.base_url = base_url
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.idle_seconds = idle_seconds
+        self.max_sockets = max_sockets
+        self.final_timeout = final_timeout
+        self._sockets: OrderedDict[tuple[str, str], SpeechSocket] = OrderedDict()
+        self._closing: set[asyncio.Task] = set()
+
+    async def open(self, session_id: str, output_format: str, segmenter: SentenceSegmenter) -> SocketSpeech:
+        socket = await self._acquire(session_id, output_format)
+        return SocketSpeech(socket, segmenter, self.final_timeout, self.limiter)
+
+    async def _acquire(self, session_id: str, output_format: str) -> SpeechSocket:
+        key = (session_id, output_format)
+        socket = self._sockets.pop(key, None)
+        if socket is not None:
+            if not socket.closed and time.monotonic() - socket.last_used < self.idle_seconds:
+                socket.last_used = time.monotonic()
+                self._sockets[key] = socket
+                self._evict()
+                return socket
+            self._retire(socket)
+
+        url = websocket_url(self.base_url, self.voice_id, self.model_id, output_format, self.idle_seconds)
+        attempt = 0
+        while True:
+            try:
+                async with self.limiter.slot():
+                    connection = await connect(url, additional_headers={"xi-api-key": self.api_key or ""})
+                break
+            except UpstreamOverloaded:
+                raise
+            except Exception as e:
+                delay = self.limiter.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+        logger.info(f"Opened ElevenLabs WebSocket for session {session_id} ({output_format})")
+        socket = SpeechSocket(connection)
+        self._sockets[key] = socket
+        self._evict()
+        return socket
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key, socket in list(self._sockets.items()):
+            idle = not socket.contexts and now - socket.last_used > self.idle_seconds
+            if socket.closed or idle or (len(self._sockets) > self.max_sockets and not socket.contexts):
+                del self._sockets[key]
+                self._retire(socket)
+
+    def _retire(self, socket: SpeechSocket) -> None:
+        task = asyncio.create_task(socket.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def close(self) -> None:
+        sockets = list(self._sockets.values())
+        self._sockets.clear()
+        await asyncio.gather(*(socket.close() for socket in sockets), *self._closing, return_exceptions=True)
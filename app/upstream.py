@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+import httpx
+import openai
+from elevenlabs.core.api_error import ApiError as ElevenLabsApiError
+from googleapiclient.errors import HttpError
+from websockets.exceptions import InvalidStatus
+
+from .config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class UpstreamOverloaded(Exception):
+    pass
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(error: Exception) -> tuple[bool, float | None]:
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES, parse_retry_after(error.response.headers.get("retry-after"))
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return True, None
+    if isinstance(error, ElevenLabsApiError):
+        headers = {key.lower(): value for key, value in (error.headers or {}).items()}
+        return error.status_code in RETRYABLE_STATUS_CODES, parse_retry_after(headers.get("retry-after"))
+    if isinstance(error, HttpError):
+        retryable = error.resp.status in RETRYABLE_STATUS_CODES - {409} or _calendar_rate_limited(error)
+        return retryable, parse_retry_after(error.resp.get("retry-after"))
+    if isinstance(error, InvalidStatus):
+        return error.response.status_code in RETRYABLE_STATUS_CODES, parse_retry_after(
+            error.response.headers.get("retry-after")
+        )
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True, None
+    return False, None
+
+
+def rejected(error: Exception) -> bool:
+    if isinstance(error, (openai.APIStatusError, ElevenLabsApiError)):
+        return error.status_code == 429
+    if isinstance(error, HttpError):
+        return error.resp.status == 429 or _calendar_rate_limited(error)
+    if isinstance(error, InvalidStatus):
+        return error.response.status_code == 429
+    return isinstance(error, ConnectionRefusedError)
+
+
+def _calendar_rate_limited(error: HttpError) -> bool:
+    return error.resp.status == 403 and "rateLimitExceeded" in str(error.content)
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_second)
+            self._updated_at = now
+            wait = max(-(self._tokens - 1) / self.rate_per_second, 0.0)
+            if wait > max_wait:
+                raise UpstreamOverloaded(f"Rate limit would delay the request by {wait:.1f}s")
+            self._tokens -= 1
+            return wait
+
+
+class UpstreamLimiter:
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: int,
+        max_concurrency: int,
+        queue_timeout: float,
+        max_retries: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._semaphore: asyncio.Semaphore | None = None
+        self._thread_semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @classmethod
+    def from_settings(cls, name: str) -> "UpstreamLimiter":
+        return cls(
+            name,
+            rate_per_second=getattr(settings, f"{name}_rate_per_second"),
+            burst=getattr(settings, f"{name}_burst"),
+            max_concurrency=getattr(settings, f"{name}_max_concurrency"),
+            queue_timeout=settings.upstream_queue_timeout_seconds,
+            max_retries=settings.upstream_max_retries,
+            retry_base_seconds=settings.upstream_retry_base_seconds,
+            retry_max_seconds=settings.upstream_retry_max_seconds,
+        )
+
+    def retry_delay(self, error: Exception, attempt: int, idempotent: bool = True) -> float | None:
+        retryable, delay = retry_after(error)
+        if not idempotent and not rejected(error):
+            retryable = False
+        if not retryable or attempt >= self.max_retries:
+            return None
+        if delay is None:
+            delay = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2**attempt))
+        logger.warning(f"{self.name} request failed ({error}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        deadline = time.monotonic() + self.queue_timeout
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise UpstreamOverloaded(f"{self.name} is at capacity, try again shortly") from None
+        try:
+            await asyncio.sleep(self.bucket.reserve(max(deadline - time.monotonic(), 0.0)))
+            yield
+        finally:
+            self._semaphore.release()
+
+    @contextmanager
+    def slot_sync(self) -> Iterator[None]:
+        deadline = time.monotonic() + self.queue_timeout
+        if not self._thread_semaphore.acquire(timeout=self.queue_timeout):
+            raise UpstreamOverloaded(f"{self.name} is at capacity, try again shortly")
+        try:
+            time.sleep(self.bucket.reserve(max(deadline - time.monotonic(), 0.0)))
+            yield
+        finally:
+            self._thread_semaphore.release()
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            try:
+                async with self.slot():
+                    return await fn()
+            except UpstreamOverloaded:
+                raise
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def call_sync(self, fn: Callable[[], T], idempotent: bool = True) -> T:
+        attempt = 0
+        while True:
+            try:
+                with self.slot_sync():
+                    return fn()
+            except UpstreamOverloaded:
+                raise
+            except Exception as e:
+                delay = self.retry_delay(e, attempt, idempotent)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
@@ -4,3 +4,13 @@ from enum import Enum
 class Mode(Enum):
     SPEECH = "speech"
     TEXT = "text"
+
+
+class AudioTransport(Enum):
+    INLINE = "inline"
+    BINARY = "binary"
+
+
+class TTSBackend(Enum):
+    HTTP = "http"
+    WEBSOCKET = "websocket"
@@ -0,0 +1,387 @@
+"""Local stand-ins for the upstream APIs used by the benchmarks.
+
+Run one with e.g. `python -m benchmarks.fakes openai --port 8101`. The OpenAI fake
+answers with a read_calendar function call whenever the latest user message
+mentions the calendar (or a short preamble and two create_calendar_event
+calls when it asks to schedule something), the ElevenLabs fake streams silent
+audio sized to the text (over HTTP or the multi-context WebSocket), and the
+Calendar fake keeps events in memory and supports sync tokens.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import re
+from email.parser import BytesParser
+from http import HTTPStatus
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+import uvicorn
+from pydantic import BaseModel
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+READ_TRIGGER = "calendar"
+WRITE_TRIGGER = "schedule"
+AUDIO_BYTES_PER_CHAR = 1000
+AUDIO_CHUNK_BYTES = 4096
+EVENT_PATH = re.compile(r"/calendar/v3/calendars/[^/]+/events(?:/(?P<event_id>[^/]+))?")
+PREAMBLE = "Sure, adding that now."
+REPLY = "Sure! Here is a short answer from the benchmark model, streamed word by word so that deltas look realistic."
+
+
+class Latency(BaseModel):
+    first_ms: float = 200
+    step_ms: float = 10
+    jitter: float = 0.2
+
+    async def sleep(self, ms: float) -> None:
+        await asyncio.sleep(max(ms * (1 + random.uniform(-self.jitter, self.jitter)), 0) / 1000)
+
+
+def _sse(event: dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _response(output: list[dict[str, Any]], status: str) -> dict[str, Any]:
+    return {
+        "id": f"resp_{uuid4().hex}",
+        "object": "response",
+        "created_at": time.time(),
+        "model": "fake",
+        "status": status,
+        "output": output,
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": 100,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": len(REPLY.split()),
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": 100 + len(REPLY.split()),
+        },
+    }
+
+
+def _message(text: str, item_id: str) -> dict[str, Any]:
+    return {
+        "id": item_id,
+        "type": "message",
+        "role": "assistant",
+        "status": "completed",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+
+
+def _function_call(name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": f"fc_{uuid4().hex}",
+        "type": "function_call",
+        "status": "completed",
+        "call_id": f"call_{uuid4().hex}",
+        "name": name,
+        "arguments": json.dumps(arguments),
+    }
+
+
+def _tool_calls(body: dict[str, Any]) -> list[dict[str, Any]]:
+    items = body.get("input")
+    if not body.get("tools") or not isinstance(items, list) or not items or items[-1].get("role") != "user":
+        return []
+
+    content = str(items[-1].get("content", "")).lower()
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if WRITE_TRIGGER in content:
+        return [
+            _function_call(
+                "create_calendar_event",
+                {
+                    "summary": f"Benchmark meeting {hour}",
+                    "start": {"dateTime": (today + timedelta(days=1, hours=hour)).strftime("%Y-%m-%dT%H:%M:%S")},
+                    "end": {"dateTime": (today + timedelta(days=1, hours=hour + 1)).strftime("%Y-%m-%dT%H:%M:%S")},
+                },
+            )
+            for hour in (10, 14)
+        ]
+    if READ_TRIGGER in content:
+        return [
+            _function_call(
+                "read_calendar",
+                {
+                    "start": today.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "end": (today + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                },
+            )
+        ]
+    return []
+
+
+def _tool_output(calls: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    if any(call["name"] == "create_calendar_event" for call in calls):
+        return [_message(PREAMBLE, f"msg_{uuid4().hex}"), *calls]
+    return calls
+
+
+def create_openai_app(latency: Latency) -> Starlette:
+    async def stream_reply() -> AsyncIterator[str]:
+        item_id = f"msg_{uuid4().hex}"
+        sequence = 0
+        await latency.sleep(latency.first_ms)
+        yield _sse({"type": "response.created", "sequence_number": sequence, "response": _response([], "in_progress")})
+
+        for word in REPLY.split(" "):
+            sequence += 1
+            yield _sse(
+                {
+                    "type": "response.output_text.delta",
+                    "sequence_number": sequence,
+                    "item_id": item_id,
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": f"{word} ",
+                    "logprobs": [],
+                }
+            )
+            await latency.sleep(latency.step_ms)
+
+        message = _message(REPLY, item_id)
+        yield _sse(
+            {"type": "response.output_item.done", "sequence_number": sequence + 1, "output_index": 0, "item": message}
+        )
+        yield _sse(
+            {
+                "type": "response.completed",
+                "sequence_number": sequence + 2,
+                "response": _response([message], "completed"),
+            }
+        )
+
+    async def stream_tool_calls(calls: list[dict[str, Any]]) -> AsyncIterator[str]:
+        sequence = 0
+        await latency.sleep(latency.first_ms)
+        yield _sse({"type": "response.created", "sequence_number": sequence, "response": _response([], "in_progress")})
+
+        output = _tool_output(calls)
+        for index, item in enumerate(output):
+            if item["type"] == "message":
+                for word in PREAMBLE.split(" "):
+                    sequence += 1
+                    yield _sse(
+                        {
+                            "type": "response.output_text.delta",
+                            "sequence_number": sequence,
+                            "item_id": item["id"],
+                            "output_index": index,
+                            "content_index": 0,
+                            "delta": f"{word} ",
+                            "logprobs": [],
+                        }
+                    )
+                    await latency.sleep(latency.step_ms)
+            else:
+                await latency.sleep(latency.step_ms * 5)
+            sequence += 1
+            yield _sse(
+                {"type": "response.output_item.done", "sequence_number": sequence, "output_index": index, "item": item}
+            )
+        yield _sse(
+            {
+                "type": "response.completed",
+                "sequence_number": sequence + 1,
+                "response": _response(output, "completed"),
+            }
+        )
+
+    async def responses(request: Request) -> Response:
+        body = await request.json()
+        calls = _tool_calls(body)
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_tool_calls(calls) if calls else stream_reply(), media_type="text/event-stream"
+            )
+        await latency.sleep(latency.first_ms + latency.step_ms * len(REPLY.split()))
+        if calls:
+            return JSONResponse(_response(_tool_output(calls), "completed"))
+        return JSONResponse(_response([_message(REPLY, f"msg_{uuid4().hex}")], "completed"))
+
+    return Starlette(routes=[Route("/v1/responses", responses, methods=["POST"])])
+
+
+def create_elevenlabs_app(latency: Latency) -> Starlette:
+    async def stream_audio(size: int) -> AsyncIterator[bytes]:
+        await latency.sleep(latency.first_ms)
+        for offset in range(0, size, AUDIO_CHUNK_BYTES):
+            yield bytes(min(AUDIO_CHUNK_BYTES, size - offset))
+            await latency.sleep(latency.step_ms)
+
+    async def text_to_speech(request: Request) -> Response:
+        body = await request.json()
+        size = max(len(body.get("text", "")), 1) * AUDIO_BYTES_PER_CHAR
+        return StreamingResponse(stream_audio(size), media_type="audio/mpeg")
+
+    async def multi_stream_input(websocket: WebSocket) -> None:
+        await websocket.accept()
+        contexts: dict[str, asyncio.Queue[str | None]] = {}
+        buffers: dict[str, str] = {}
+        tasks: list[asyncio.Task] = []
+
+        async def generate(context_id: str, queue: asyncio.Queue[str | None]) -> None:
+            while (text := await queue.get()) is not None:
+                await latency.sleep(latency.first_ms)
+                size = max(len(text), 1) * AUDIO_BYTES_PER_CHAR
+                for offset in range(0, size, AUDIO_CHUNK_BYTES):
+                    audio = base64.b64encode(bytes(min(AUDIO_CHUNK_BYTES, size - offset))).decode()
+                    await websocket.send_json({"audio": audio, "contextId": context_id, "isFinal": False})
+                    await latency.sleep(latency.step_ms)
+            await websocket.send_json({"contextId": context_id, "isFinal": True})
+
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if message.get("close_socket"):
+                    break
+                context_id = message.get("context_id", "")
+                if context_id not in contexts:
+                    contexts[context_id] = asyncio.Queue()
+                    buffers[context_id] = ""
+                    tasks.append(asyncio.create_task(generate(context_id, contexts[context_id])))
+                buffers[context_id] += message.get("text", "")
+                if message.get("flush") or message.get("close_context"):
+                    if buffers[context_id].strip():
+                        contexts[context_id].put_nowait(buffers[context_id])
+                    buffers[context_id] = ""
+                if message.get("close_context"):
+                    contexts.pop(context_id).put_nowait(None)
+                    del buffers[context_id]
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return Starlette(
+        routes=[
+            Route("/v1/text-to-speech/{voice_id}/stream", text_to_speech, methods=["POST"]),
+            WebSocketRoute("/v1/text-to-speech/{voice_id}/multi-stream-input", multi_stream_input),
+        ]
+    )
+
+
+def create_calendar_app(latency: Latency, seed_events: int = 20) -> Starlette:
+    events: dict[str, dict[str, Any]] = {}
+    versions: dict[str, int] = {}
+    clock = 0
+
+    def store(event: dict[str, Any]) -> dict[str, Any]:
+        nonlocal clock
+        clock += 1
+        event = {**event, "status": event.get("status", "confirmed")}
+        events[event["id"]] = event
+        versions[event["id"]] = clock
+        return event
+
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=2)
+    for index in range(seed_events):
+        event_start = start + timedelta(hours=5 * index)
+        store(
+            {
+                "id": uuid4().hex,
+                "summary": f"Benchmark event {index}",
+                "start": {"dateTime": event_start.strftime("%Y-%m-%dT%H:%M:%S"), "timeZone": "UTC"},
+                "end": {
+                    "dateTime": (event_start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S"),
+                    "timeZone": "UTC",
+                },
+            }
+        )
+
+    def list_events(params: dict[str, str]) -> tuple[int, dict[str, Any]]:
+        since = int(params.get("syncToken", 0))
+        items = [event for event_id, event in events.items() if versions[event_id] > since]
+        return 200, {"kind": "calendar#events", "items": items, "nextSyncToken": str(clock)}
+
+    def insert_event(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        return 200, store({**body, "id": uuid4().hex})
+
+    def update_event(event_id: str, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        if event_id not in events:
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        return 200, store({**body, "id": event_id})
+
+    def handle(method: str, path: str, params: dict[str, str], body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        match = EVENT_PATH.fullmatch(path)
+        if match is None:
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        if method == "GET" and match["event_id"] is None:
+            return list_events(params)
+        if method == "POST" and match["event_id"] is None:
+            return insert_event(body)
+        if method == "PUT" and match["event_id"] is not None:
+            return update_event(match["event_id"], body)
+        return 405, {"error": {"code": 405, "message": "Method Not Allowed"}}
+
+    async def events_route(request: Request) -> Response:
+        await latency.sleep(latency.first_ms)
+        body = await request.json() if request.method in ("POST", "PUT") else {}
+        status, payload = handle(request.method, request.url.path, dict(request.query_params), body)
+        return JSONResponse(payload, status_code=status)
+
+    async def batch_route(request: Request) -> Response:
+        await latency.sleep(latency.first_ms)
+        content_type = request.headers["content-type"].encode()
+        message = BytesParser().parsebytes(b"Content-Type: " + content_type + b"\r\n\r\n" + await request.body())
+        boundary = f"batch_{uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            head, _, body = part.get_payload().replace("\r\n", "\n").partition("\n\n")
+            method, target, _ = head.split("\n", 1)[0].split(" ", 2)
+            path, _, query = target.partition("?")
+            params = dict(pair.split("=", 1) for pair in query.split("&") if "=" in pair)
+            status, payload = handle(method, path, params, json.loads(body) if body.strip() else {})
+            content_id = part["Content-ID"].strip("<>")
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+        return Response("".join(parts) + f"--{boundary}--\r\n", media_type=f"multipart/mixed; boundary={boundary}")
+
+    return Starlette(
+        routes=[
+            Route("/calendar/v3/calendars/{calendar_id}/events", events_route, methods=["GET", "POST"]),
+            Route("/calendar/v3/calendars/{calendar_id}/events/{event_id}", events_route, methods=["PUT"]),
+            Route("/batch/calendar/v3", batch_route, methods=["POST"]),
+        ]
+    )
+
+
+FAKES = {
+    "openai": create_openai_app,
+    "elevenlabs": create_elevenlabs_app,
+    "calendar": create_calendar_app,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("upstream", choices=sorted(FAKES))
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--first-ms", type=float, default=200)
+    parser.add_argument("--step-ms", type=float, default=10)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    args = parser.parse_args()
+
+    latency = Latency(first_ms=args.first_ms, step_ms=args.step_ms, jitter=args.jitter)
+    uvicorn.run(FAKES[args.upstream](latency), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
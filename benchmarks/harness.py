@@ -0,0 +1,90 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise TimeoutError(f"{url} did not become ready within {timeout}s")
+
+
+def start_fake(upstream: str, port: int, first_ms: float, step_ms: float, jitter: float = 0.2) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fakes",
+            upstream,
+            "--port",
+            str(port),
+            "--first-ms",
+            str(first_ms),
+            "--step-ms",
+            str(step_ms),
+            "--jitter",
+            str(jitter),
+        ]
+    )
+    wait_until_ready(f"http://127.0.0.1:{port}/", process)
+    return process
+
+
+def stop(process: subprocess.Popen, timeout: float = 30) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def percentile(values: list[float], percentile: float) -> float:
+    if not values:
+        return float("nan")
+    return (
+        statistics.quantiles(values, n=100, method="inclusive")[int(percentile) - 1] if len(values) > 1 else values[0]
+    )
+
+
+def peak_rss_bytes(pid: int) -> int | None:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            pids += [int(child) for child in children.read().split()]
+    except OSError:
+        return None
+
+    total = 0
+    for process_id in pids:
+        try:
+            with open(f"/proc/{process_id}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+def server_env(port: int, workers: int, data_dir: str, **upstreams: str) -> dict[str, str]:
+    return {
+        **os.environ,
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+        "SESSION_DB_PATH": os.path.join(data_dir, "sessions.db"),
+        "TASK_STORE_PATH": os.path.join(data_dir, "tasks.db"),
+        **{key.upper(): value for key, value in upstreams.items()},
+    }
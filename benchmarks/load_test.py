@@ -0,0 +1,202 @@
+"""End-to-end latency benchmark of main.py against local fakes of all upstreams.
+
+Starts the OpenAI, ElevenLabs and Google Calendar fakes from benchmarks.fakes,
+starts main.py against them and drives it with concurrent message/stream sessions
+mixing text and speech mode, some of which trigger a calendar read or a pair of
+calendar writes. Reports throughput, time to first text (TTFT), time to first
+audio (TTFA), total latency percentiles and the server's peak RSS. Run from the repository root:
+
+    python -m benchmarks.load_test --sessions 32 --duration 30 --speech-ratio 0.5 --tool-ratio 0.3 --write-ratio 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from uuid import uuid4
+
+import httpx
+from pydantic import BaseModel
+
+from .harness import peak_rss_bytes, percentile, server_env, start_fake, stop, wait_until_ready
+
+QUERIES = {
+    "chat": "hey Rtos, how are you?",
+    "read": "hey Rtos, what is on my calendar today?",
+    "write": "hey Rtos, please schedule two meetings tomorrow",
+}
+
+
+class Sample(BaseModel):
+    mode: str
+    scenario: str
+    ok: bool
+    total: float
+    ttft: float | None = None
+    ttfa: float | None = None
+
+
+def _message_stream(context_id: str, mode: str, scenario: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": uuid4().hex,
+        "method": "message/stream",
+        "params": {
+            "message": {
+                "role": "user",
+                "kind": "message",
+                "messageId": uuid4().hex,
+                "contextId": context_id,
+                "parts": [{"kind": "text", "text": QUERIES[scenario]}],
+            },
+            "metadata": {"mode": mode},
+        },
+    }
+
+
+async def _request(client: httpx.AsyncClient, url: str, context_id: str, mode: str, scenario: str) -> Sample:
+    sample = Sample(mode=mode, scenario=scenario, ok=False, total=0)
+    started = time.perf_counter()
+    try:
+        async with client.stream("POST", url, json=_message_stream(context_id, mode, scenario)) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                result = json.loads(line[5:]).get("result", {})
+                status = result.get("status", {})
+                for part in (status.get("message") or {}).get("parts", []):
+                    if part.get("kind") == "text" and sample.ttft is None:
+                        sample.ttft = time.perf_counter() - started
+                    elif part.get("kind") == "file" and sample.ttfa is None:
+                        sample.ttfa = time.perf_counter() - started
+                if result.get("final"):
+                    sample.ok = status.get("state") == "completed"
+    except httpx.HTTPError:
+        pass
+    sample.total = time.perf_counter() - started
+    return sample
+
+
+def _scenario(tool_ratio: float, write_ratio: float) -> str:
+    draw = random.random()
+    if draw < write_ratio:
+        return "write"
+    return "read" if draw < write_ratio + tool_ratio else "chat"
+
+
+async def _drive(
+    url: str, sessions: int, duration: float, speech_ratio: float, tool_ratio: float, write_ratio: float
+) -> list[Sample]:
+    samples: list[Sample] = []
+    deadline = time.monotonic() + duration
+
+    async def session_loop(client: httpx.AsyncClient) -> None:
+        context_id = uuid4().hex
+        while time.monotonic() < deadline:
+            mode = "speech" if random.random() < speech_ratio else "text"
+            samples.append(await _request(client, url, context_id, mode, _scenario(tool_ratio, write_ratio)))
+
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        await asyncio.gather(*(session_loop(client) for _ in range(sessions)))
+    return samples
+
+
+def _milliseconds(values: list[float]) -> str:
+    return " ".join(f"{percentile(values, p) * 1000:>7.0f}" for p in (50, 95, 99))
+
+
+def _report(samples: list[Sample], duration: float, peak_rss: int | None) -> None:
+    groups: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        groups[sample.mode if sample.scenario == "chat" else f"{sample.mode}+{sample.scenario}"].append(sample)
+    groups["all"] = samples
+
+    print(
+        f"{'scenario':<12} {'requests':>8} {'req/s':>7} {'errors':>6}  "
+        f"{'TTFT p50/p95/p99 ms':>23}  {'TTFA p50/p95/p99 ms':>23}  {'total p50/p95/p99 ms':>23}"
+    )
+    for name, group in sorted(groups.items()):
+        ok = [sample for sample in group if sample.ok]
+        print(
+            f"{name:<12} {len(group):>8} {len(ok) / duration:>7.1f} {len(group) - len(ok):>6}  "
+            f"{_milliseconds([s.ttft for s in ok if s.ttft is not None])}  "
+            f"{_milliseconds([s.ttfa for s in ok if s.ttfa is not None])}  "
+            f"{_milliseconds([s.total for s in ok])}"
+        )
+    print(f"peak RSS: {peak_rss / 1024 / 1024:.1f} MiB" if peak_rss is not None else "peak RSS: unavailable")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--speech-ratio", type=float, default=0.5)
+    parser.add_argument("--tool-ratio", type=float, default=0.3)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=9990)
+    parser.add_argument("--openai-port", type=int, default=8101)
+    parser.add_argument("--elevenlabs-port", type=int, default=8102)
+    parser.add_argument("--calendar-port", type=int, default=8103)
+    parser.add_argument("--openai-first-ms", type=float, default=300)
+    parser.add_argument("--openai-step-ms", type=float, default=15)
+    parser.add_argument("--tts-first-ms", type=float, default=150)
+    parser.add_argument("--tts-step-ms", type=float, default=20)
+    parser.add_argument("--calendar-ms", type=float, default=120)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--tts-backend", choices=["http", "websocket"], default="http")
+    args = parser.parse_args()
+
+    fakes = []
+    try:
+        fakes.append(start_fake("openai", args.openai_port, args.openai_first_ms, args.openai_step_ms, args.jitter))
+        fakes.append(start_fake("elevenlabs", args.elevenlabs_port, args.tts_first_ms, args.tts_step_ms, args.jitter))
+        fakes.append(start_fake("calendar", args.calendar_port, args.calendar_ms, 0, args.jitter))
+
+        env = server_env(
+            args.port,
+            args.workers,
+            tempfile.mkdtemp(prefix="rtos-bench-"),
+            openai_api_key="benchmark",
+            openai_base_url=f"http://127.0.0.1:{args.openai_port}/v1",
+            elevenlabs_api_key="benchmark",
+            elevenlabs_base_url=f"http://127.0.0.1:{args.elevenlabs_port}",
+            calendar_api_endpoint=f"http://127.0.0.1:{args.calendar_port}/calendar/v3/",
+            calendar_anonymous="true",
+            email_address="benchmark@example.com",
+            tts_cache_enabled="false",
+            tts_backend=args.tts_backend,
+        )
+        server = subprocess.Popen(
+            [sys.executable, "main.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_ready(f"http://127.0.0.1:{args.port}/.well-known/agent-card.json", server)
+            samples = asyncio.run(
+                _drive(
+                    f"http://127.0.0.1:{args.port}/",
+                    args.sessions,
+                    args.duration,
+                    args.speech_ratio,
+                    args.tool_ratio,
+                    args.write_ratio,
+                )
+            )
+            peak_rss = peak_rss_bytes(server.pid)
+        finally:
+            stop(server)
+    finally:
+        for fake in fakes:
+            stop(fake)
+
+    _report(samples, args.duration, peak_rss)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Measure A2A throughput of main.py as the number of uvicorn workers grows.
+
+Starts the fake OpenAI server from benchmarks.fakes, then for every worker count
+starts main.py against it and drives it with concurrent text-mode message/send
+requests. Run from the repository root:
+
+    python -m benchmarks.worker_scaling --workers 1 2 4 --concurrency 64 --duration 20
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+import httpx
+
+from .harness import percentile, server_env, start_fake, stop, wait_until_ready
+
+
+def _message_send(context_id: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": uuid4().hex,
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "kind": "message",
+                "messageId": uuid4().hex,
+                "contextId": context_id,
+                "parts": [{"kind": "text", "text": "hey Rtos, how are you?"}],
+            },
+            "metadata": {"mode": "text"},
+        },
+    }
+
+
+async def _drive(url: str, concurrency: int, duration: float) -> tuple[int, int, list[float]]:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        context_id = uuid4().hex
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json=_message_send(context_id))
+                response.raise_for_status()
+                if "error" in response.json():
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return len(latencies), errors, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=9990)
+    parser.add_argument("--fake-port", type=int, default=8101)
+    parser.add_argument("--first-ms", type=float, default=200)
+    parser.add_argument("--step-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    fake = start_fake("openai", args.fake_port, args.first_ms, args.step_ms)
+    results = []
+    try:
+        for workers in args.workers:
+            data_dir = tempfile.mkdtemp(prefix="rtos-bench-")
+            env = server_env(
+                args.port,
+                workers,
+                data_dir,
+                openai_api_key="benchmark",
+                openai_base_url=f"http://127.0.0.1:{args.fake_port}/v1",
+                calendar_prewarm="false",
+            )
+            server = subprocess.Popen(
+                [sys.executable, "main.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                wait_until_ready(f"http://127.0.0.1:{args.port}/.well-known/agent-card.json", server)
+                completed, errors, latencies = asyncio.run(
+                    _drive(f"http://127.0.0.1:{args.port}/", args.concurrency, args.duration)
+                )
+                results.append((workers, completed / args.duration, errors, latencies))
+            finally:
+                stop(server)
+    finally:
+        stop(fake)
+
+    print(f"{'workers':>8} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for workers, throughput, errors, latencies in results:
+        print(
+            f"{workers:>8} {throughput:>8.1f} {errors:>7} {percentile(latencies, 50) * 1000:>8.0f} "
+            f"{percentile(latencies, 95) * 1000:>8.0f} {percentile(latencies, 99) * 1000:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
+import asyncio
 import uvicorn
 import logging
+from starlette.applications import Starlette
 from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
 
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
 from app.agent_executor import Executor
+from app.config.settings import settings
+from app.metrics import monitor_event_loop_lag, render
+from app.task_store import SqliteTaskStore
 
 
 logging.basicConfig(
@@ -18,7 +24,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main() -> None:
+def create_app() -> Starlette:
     skill = AgentSkill(
         id="chat",
         name="Rtos Chat",
@@ -39,9 +45,18 @@ def main() -> None:
         supports_authenticated_extended_card=False,
     )
 
+    executor = Executor()
+    task_store = SqliteTaskStore(
+        path=settings.task_store_path,
+        flush_interval_seconds=settings.task_store_flush_interval_seconds,
+        batch_size=settings.task_store_batch_size,
+        ttl_seconds=settings.task_store_ttl_seconds,
+        drop_intermediate_history=settings.task_store_drop_intermediate_history,
+    )
+
     request_handler = DefaultRequestHandler(
-        agent_executor=Executor(),
-        task_store=InMemoryTaskStore(),
+        agent_executor=executor,
+        task_store=task_store,
     )
 
     server = A2AStarletteApplication(
@@ -51,6 +66,45 @@ def main() -> None:
 
     app = server.build()
 
+    async def audio_stream(request: Request) -> Response:
+        stream_id = request.path_params["task_id"]
+        stream = executor.audio_broker.get(stream_id)
+        if stream is None:
+            return Response(status_code=404)
+        return StreamingResponse(executor.audio_broker.subscribe(stream_id, stream), media_type=stream.mime_type)
+
+    async def metrics(request: Request) -> Response:
+        return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+    app.add_route("/audio/{task_id}", audio_stream, methods=["GET"])
+    app.add_route("/metrics", metrics, methods=["GET"])
+    app.add_event_handler("shutdown", task_store.close)
+    app.add_event_handler("shutdown", executor.agent.calendar_client.close)
+    app.add_event_handler("shutdown", executor.agent.tool_runner.shutdown)
+    if executor.agent.sessions.backend is not None:
+        app.add_event_handler("shutdown", executor.agent.sessions.backend.close)
+    if executor.agent.speech_sockets is not None:
+        app.add_event_handler("shutdown", executor.agent.speech_sockets.close)
+
+    background: set[asyncio.Task] = set()
+
+    def run_in_background(coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        background.add(task)
+        task.add_done_callback(background.discard)
+
+    async def start_background_tasks() -> None:
+        run_in_background(monitor_event_loop_lag(settings.metrics_loop_lag_interval_seconds))
+        if settings.calendar_prewarm:
+            run_in_background(asyncio.to_thread(executor.agent.calendar_client.warm_up))
+
+    async def stop_background_tasks() -> None:
+        for task in background:
+            task.cancel()
+
+    app.add_event_handler("startup", start_background_tasks)
+    app.add_event_handler("shutdown", stop_background_tasks)
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:5173"],
@@ -59,7 +113,23 @@ def main() -> None:
         allow_headers=["Content-Type", "Authorization"],
     )
 
-    uvicorn.run(app, host="0.0.0.0", port=9999)
+    return app
+
+
+def main() -> None:
+    if settings.server_workers > 1 and not settings.session_db_path:
+        logger.warning("Running multiple workers without SESSION_DB_PATH, conversations will not be shared")
+
+    if settings.server_workers > 1:
+        uvicorn.run(
+            "main:create_app",
+            factory=True,
+            host=settings.server_host,
+            port=settings.server_port,
+            workers=settings.server_workers,
+        )
+    else:
+        uvicorn.run(create_app(), host=settings.server_host, port=settings.server_port)
 
 
 if __name__ == "__main__":